@@ -35,7 +35,13 @@ def main() -> None:
 
     server = HttpServer(port=args.port, db_path=args.db)
     try:
-        asyncio.run(server.start())
+        try:
+            # Optional: libuv-backed event loop (2-4x on I/O-bound servers).
+            # Zero-dependency promise holds — stdlib loop is the fallback.
+            import uvloop
+            uvloop.run(server.start())
+        except ImportError:
+            asyncio.run(server.start())
     except KeyboardInterrupt:
         pass
 
@@ -2,18 +2,41 @@
 
 import json
 import os
-import shutil
-import subprocess
 import sys
-import time
-from pathlib import Path
-from urllib.request import urlopen, Request
-from urllib.error import URLError
-
-from . import pid as pidmod
 
 DEFAULT_PORT = 7878
 
+# Computed once at import: _shorten_path runs per row in list output, and
+# the install commands all resolve paths relative to this package.
+_HOME = os.path.expanduser("~")
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Heavier stdlib modules (http.client, subprocess, shutil, pathlib) are
+# imported inside the commands that need them: CLI invocations are
+# short-lived and interpreter startup is dominated by import time.
+
+try:
+    # Optional: C-backed serializer producing bytes directly.
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def _dumps_pretty(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def _dumps_pretty(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+
+# Persistent keep-alive connection to the daemon, created on first use.
+# Commands that fire several API calls (status, list + events loops) reuse
+# the same socket instead of paying a TCP handshake per call.
+_conn = None
+
 
 def _port() -> int:
     return int(os.environ.get("CODEX_NOTIFY_DAEMON_PORT", DEFAULT_PORT))
@@ -23,73 +46,158 @@ def _base_url() -> str:
     return f"http://127.0.0.1:{_port()}"
 
 
+def _connection():
+    global _conn
+    if _conn is None:
+        import http.client
+        _conn = http.client.HTTPConnection("127.0.0.1", _port(), timeout=5)
+    return _conn
+
+
+def _drop_connection() -> None:
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
+
+
+def _api_request(method: str, path: str, body: dict | None = None) -> dict | list:
+    """Issue a request on the shared connection, reconnecting once if stale."""
+    import http.client
+    data = None
+    headers = {"Connection": "keep-alive"}
+    if body is not None:
+        data = _dumps(body)
+        headers["Content-Type"] = "application/json"
+    last_error: Exception = ConnectionError("request failed")
+    for attempt in range(2):
+        conn = _connection()
+        try:
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+            return json.loads(resp.read().decode())
+        except (http.client.HTTPException, OSError, json.JSONDecodeError, ValueError) as e:
+            # A stale keep-alive socket (daemon restarted, idle timeout)
+            # surfaces here — drop it and retry once on a fresh connection.
+            _drop_connection()
+            last_error = e
+    if isinstance(last_error, (OSError, ValueError)):
+        raise last_error
+    raise ConnectionError(str(last_error))
+
+
 def _api_get(path: str) -> dict | list | None:
     try:
-        req = Request(f"{_base_url()}{path}")
-        with urlopen(req, timeout=3) as resp:
-            return json.loads(resp.read().decode())
-    except (URLError, OSError, json.JSONDecodeError, ValueError):
+        return _api_request("GET", path)
+    except (OSError, ValueError):
         return None
 
 
 def _api_post(path: str, body: dict | None = None) -> dict | list | None:
     try:
-        data = json.dumps(body or {}).encode()
-        req = Request(
-            f"{_base_url()}{path}",
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        with urlopen(req, timeout=5) as resp:
-            return json.loads(resp.read().decode())
-    except (URLError, OSError, json.JSONDecodeError, ValueError) as e:
+        return _api_request("POST", path, body=body or {})
+    except (OSError, ValueError) as e:
         return {"error": str(e)}
 
 
 def _api_delete(path: str) -> dict | None:
     try:
-        req = Request(f"{_base_url()}{path}", method="DELETE")
-        with urlopen(req, timeout=3) as resp:
-            return json.loads(resp.read().decode())
-    except (URLError, OSError, json.JSONDecodeError, ValueError):
+        return _api_request("DELETE", path)
+    except (OSError, ValueError):
         return None
 
 
+def _api_get_many(paths: list[str]) -> list[dict | list | None]:
+    """Fetch several GET endpoints in one round trip via POST /api/batch.
+
+    Falls back to sequential _api_get calls when the daemon predates the
+    batch endpoint. Returns one result per path (None on failure).
+    """
+    result = _api_post("/api/batch", {
+        "requests": [{"method": "GET", "path": p} for p in paths],
+    })
+    if isinstance(result, dict) and isinstance(result.get("responses"), list):
+        responses = result["responses"]
+        if len(responses) == len(paths):
+            return [
+                r.get("body")
+                if isinstance(r, dict) and r.get("status", 500) < 400
+                else None
+                for r in responses
+            ]
+    return [_api_get(p) for p in paths]
+
+
+_daemon_checked = False
+
+
 def _require_daemon() -> None:
+    """Exit unless the daemon is running.
+
+    The PID-file check runs at most once per process, and scripted loops
+    can export AGENT_NOTIFY_DAEMON_OK=1 after 'daemon start' to skip the
+    stat entirely for each short-lived invocation.
+    """
+    global _daemon_checked
+    if _daemon_checked or os.environ.get("AGENT_NOTIFY_DAEMON_OK"):
+        return
+    from . import pid as pidmod
     if not pidmod.is_running():
         print("agent-notify daemon is not running", file=sys.stderr)
         print("Start it with: agent-notify daemon start", file=sys.stderr)
         sys.exit(1)
+    _daemon_checked = True
 
 
 # --- Daemon commands ---
 
 def cmd_daemon_start() -> None:
+    import socket
+    import subprocess
+    import time
+
+    from . import pid as pidmod
+
     if pidmod.is_running():
         pid = pidmod.read_pid()
         print(f"agent-notify daemon already running (PID {pid})")
         return
 
-    daemon_dir = Path(__file__).resolve().parent.parent
+    daemon_dir = os.path.dirname(_SCRIPT_DIR)
     port = _port()
 
     cmd = [
         sys.executable, "-m", "daemon", "--serve", "--port", str(port),
     ]
 
-    with open(os.devnull, "r") as devnull:
-        proc = subprocess.Popen(
-            cmd,
-            cwd=str(daemon_dir),
-            stdin=devnull,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            start_new_session=True,
-        )
-
-    time.sleep(0.5)
-    if proc.poll() is not None:
+    # close_fds=False and no preexec_fn keep subprocess on the posix_spawn
+    # fast path (vforked on glibc) instead of a full fork+exec.
+    proc = subprocess.Popen(
+        cmd,
+        cwd=daemon_dir,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=False,
+        start_new_session=True,
+    )
+
+    # Probe the port until the server accepts connections instead of a flat
+    # sleep: typical start is ready in tens of ms, crashes surface promptly.
+    deadline = time.monotonic() + 3.0
+    ready = False
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            print("agent-notify daemon failed to start", file=sys.stderr)
+            sys.exit(1)
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.05).close()
+            ready = True
+            break
+        except OSError:
+            time.sleep(0.02)
+
+    if not ready and proc.poll() is not None:
         print("agent-notify daemon failed to start", file=sys.stderr)
         sys.exit(1)
 
@@ -98,6 +206,7 @@ def cmd_daemon_start() -> None:
 
 
 def cmd_daemon_stop() -> None:
+    from . import pid as pidmod
     if not pidmod.is_running():
         print("agent-notify daemon is not running")
         return
@@ -111,6 +220,7 @@ def cmd_daemon_stop() -> None:
 
 
 def cmd_daemon_status() -> None:
+    from . import pid as pidmod
     if not pidmod.is_running():
         print("agent-notify daemon is not running")
         return
@@ -147,8 +257,7 @@ def cmd_agents_list() -> None:
         return
 
     header = f"{'SESSION ID':<20} {'AGENT':<10} {'STATUS':<10} {'LAST EVENT':<12} {'PROJECT':<30} {'EVENTS':>6}"
-    print(header)
-    print("-" * len(header))
+    lines = [header, "-" * len(header)]
     for s in sessions:
         sid = s.get("session_id", "")[:20]
         agent = s.get("agent_name", "")[:10]
@@ -156,7 +265,8 @@ def cmd_agents_list() -> None:
         last_event = s.get("last_event", "")[:12]
         project = _shorten_path(s.get("project_cwd", ""))[:30]
         count = s.get("event_count", 0)
-        print(f"{sid:<20} {agent:<10} {status:<10} {last_event:<12} {project:<30} {count:>6}")
+        lines.append(f"{sid:<20} {agent:<10} {status:<10} {last_event:<12} {project:<30} {count:>6}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def cmd_agents_status(session_id: str) -> None:
@@ -247,6 +357,16 @@ def cmd_agents_stop(session_id: str) -> None:
 
 def cmd_agents_events(session_id: str) -> None:
     _require_daemon()
+
+    # Optional: stream long event histories incrementally instead of
+    # buffering the whole response. Stdlib fallback below stays the default.
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+    if ijson is not None and _stream_events(ijson, session_id):
+        return
+
     events = _api_get(f"/api/agents/{session_id}/events")
     if events is None:
         print("failed to connect to daemon", file=sys.stderr)
@@ -254,11 +374,40 @@ def cmd_agents_events(session_id: str) -> None:
     if isinstance(events, dict) and "error" in events:
         print(f"error: {events['error']}", file=sys.stderr)
         sys.exit(1)
+    lines = []
     for e in events:
-        t = e.get("created_at", "")[:19].replace("T", " ")
-        cat = e.get("category", "")
-        title = e.get("title", "")
-        print(f"  {t}  [{cat:<10}]  {title}")
+        lines.append(_format_event_row(e))
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _format_event_row(e: dict) -> str:
+    t = e.get("created_at", "")[:19].replace("T", " ")
+    cat = e.get("category", "")
+    title = e.get("title", "")
+    return f"  {t}  [{cat:<10}]  {title}"
+
+
+def _stream_events(ijson, session_id: str) -> bool:
+    """Print events as they arrive via incremental parsing.
+
+    Returns True if the stream completed; False to fall back to the
+    buffered path (connection error, error-object response, etc.).
+    """
+    try:
+        conn = _connection()
+        conn.request("GET", f"/api/agents/{session_id}/events",
+                     headers={"Connection": "keep-alive"})
+        resp = conn.getresponse()
+        if resp.status != 200:
+            resp.read()  # drain so the connection stays reusable
+            return False
+        for e in ijson.items(resp, "item"):
+            sys.stdout.write(_format_event_row(e) + "\n")
+        return True
+    except (OSError, ValueError):
+        _drop_connection()
+        return False
 
 
 # --- Message commands ---
@@ -273,8 +422,7 @@ def cmd_messages_list() -> None:
         print("no messages")
         return
     header = f"{'ID':>4} {'FROM':<16} {'TO':<16} {'TYPE':<10} {'STATUS':<10} {'CONTENT':<40}"
-    print(header)
-    print("-" * len(header))
+    lines = [header, "-" * len(header)]
     for m in messages:
         mid = m.get("id", 0)
         fr = m.get("from_session", "")[:16]
@@ -282,7 +430,8 @@ def cmd_messages_list() -> None:
         mt = m.get("message_type", "")[:10]
         st = m.get("status", "")[:10]
         ct = m.get("content", "")[:40]
-        print(f"{mid:>4} {fr:<16} {to:<16} {mt:<10} {st:<10} {ct:<40}")
+        lines.append(f"{mid:>4} {fr:<16} {to:<16} {mt:<10} {st:<10} {ct:<40}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def cmd_messages_send(from_session: str, to_session: str, content: str, msg_type: str = "handoff") -> None:
@@ -333,10 +482,12 @@ def cmd_rules_list() -> None:
         print("no coordination rules (default: require approval for all)")
         return
     header = f"{'ID':>4} {'FROM':<12} {'TO':<12} {'EVENT TYPE':<12} {'ACTION':<10}"
-    print(header)
-    print("-" * len(header))
-    for r in rules:
-        print(f"{r.get('id',0):>4} {r.get('from_agent','*'):<12} {r.get('to_agent','*'):<12} {r.get('event_type','*'):<12} {r.get('action','approve'):<10}")
+    lines = [header, "-" * len(header)]
+    lines.extend(
+        f"{r.get('id',0):>4} {r.get('from_agent','*'):<12} {r.get('to_agent','*'):<12} {r.get('event_type','*'):<12} {r.get('action','approve'):<10}"
+        for r in rules
+    )
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def cmd_rules_add(from_agent: str, to_agent: str, event_type: str, action: str) -> None:
@@ -370,12 +521,78 @@ def cmd_rules_remove(rule_id: str) -> None:
 # --- Helpers ---
 
 def _shorten_path(p: str) -> str:
-    home = str(Path.home())
-    if p.startswith(home):
-        return "~" + p[len(home):]
+    if p.startswith(_HOME):
+        return "~" + p[len(_HOME):]
     return p
 
 
+def _spawn_from_argv(argv: list[str]) -> None:
+    # agent-notify agents spawn [AGENT] [--prompt PROMPT] [--cwd DIR]
+    # argparse is imported lazily so only the spawn path pays for it.
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="agent-notify agents spawn", add_help=False
+    )
+    parser.add_argument("agent", nargs="?", default="claude")
+    parser.add_argument("--prompt", default="")
+    parser.add_argument("--cwd", default="")
+    args, _ = parser.parse_known_args(argv[3:])
+    cmd_agents_spawn(args.agent, args.prompt, args.cwd)
+
+
+def _mcp_install_from_argv(argv: list[str]) -> None:
+    scope = "user"
+    if len(argv) > 3 and argv[3] == "--scope" and len(argv) > 4:
+        scope = argv[4]
+    cmd_mcp_install(scope)
+
+
+def _mcp_serve(argv: list[str]) -> None:
+    # Run the MCP server directly
+    from .mcp import main as mcp_main
+    mcp_main()
+
+
+# (group, sub) -> (min positional args after sub, handler taking argv).
+# O(1) lookup replaces the old if/elif ladder over every command name.
+_DISPATCH = {
+    ("daemon", "start"): (0, lambda argv: cmd_daemon_start()),
+    ("daemon", "stop"): (0, lambda argv: cmd_daemon_stop()),
+    ("daemon", "status"): (0, lambda argv: cmd_daemon_status()),
+    ("agents", "list"): (0, lambda argv: cmd_agents_list()),
+    ("agents", "spawn"): (0, _spawn_from_argv),
+    ("agents", "stop"): (1, lambda argv: cmd_agents_stop(argv[3])),
+    ("agents", "status"): (1, lambda argv: cmd_agents_status(argv[3])),
+    ("agents", "approve"): (1, lambda argv: cmd_agents_approve(argv[3])),
+    ("agents", "reject"): (1, lambda argv: cmd_agents_reject(argv[3])),
+    ("agents", "send"): (2, lambda argv: cmd_agents_send(argv[3], " ".join(argv[4:]))),
+    ("agents", "interrupt"): (1, lambda argv: cmd_agents_interrupt(argv[3])),
+    ("agents", "events"): (1, lambda argv: cmd_agents_events(argv[3])),
+    ("messages", "list"): (0, lambda argv: cmd_messages_list()),
+    ("messages", "send"): (3, lambda argv: cmd_messages_send(
+        argv[3], argv[4], argv[5], argv[6] if len(argv) > 6 else "handoff")),
+    ("messages", "approve"): (1, lambda argv: cmd_messages_approve(argv[3])),
+    ("messages", "reject"): (1, lambda argv: cmd_messages_reject(argv[3])),
+    ("rules", "list"): (0, lambda argv: cmd_rules_list()),
+    ("rules", "add"): (4, lambda argv: cmd_rules_add(argv[3], argv[4], argv[5], argv[6])),
+    ("rules", "remove"): (1, lambda argv: cmd_rules_remove(argv[3])),
+    ("guard", "install"): (0, lambda argv: cmd_guard_install()),
+    ("guard", "status"): (0, lambda argv: cmd_guard_status()),
+    ("mcp", "install"): (0, _mcp_install_from_argv),
+    ("mcp", "serve"): (0, _mcp_serve),
+}
+
+_GROUP_USAGE = {
+    "daemon": "Usage: agent-notify daemon <start|stop|status>",
+    "agents": "Usage: agent-notify agents <list|spawn|stop|status|approve|reject|send|interrupt|events> [SESSION_ID] [args]",
+    "messages": "Usage: agent-notify messages <list|send FROM TO CONTENT [TYPE]|approve ID|reject ID>",
+    "rules": "Usage: agent-notify rules <list|add FROM TO EVENT_TYPE ACTION|remove ID>",
+    "guard": "Usage: agent-notify guard <install|status>",
+    "mcp": "Usage: agent-notify mcp <install [--scope user|project]|serve>",
+}
+
+
 def main() -> None:
     if len(sys.argv) < 2:
         _usage()
@@ -384,116 +601,27 @@ def main() -> None:
     group = sys.argv[1]
     sub = sys.argv[2] if len(sys.argv) > 2 else ""
 
-    if group == "daemon":
-        if sub == "start":
-            cmd_daemon_start()
-        elif sub == "stop":
-            cmd_daemon_stop()
-        elif sub == "status":
-            cmd_daemon_status()
-        else:
-            print("Usage: agent-notify daemon <start|stop|status>", file=sys.stderr)
-            sys.exit(1)
-
-    elif group == "agents":
-        sid = sys.argv[3] if len(sys.argv) > 3 else ""
-        if sub == "list":
-            cmd_agents_list()
-        elif sub == "spawn":
-            # agent-notify agents spawn [AGENT] [--prompt PROMPT] [--cwd DIR]
-            agent = "claude"
-            prompt = ""
-            cwd = ""
-            i = 3
-            while i < len(sys.argv):
-                if sys.argv[i] == "--prompt" and i + 1 < len(sys.argv):
-                    prompt = sys.argv[i + 1]
-                    i += 2
-                elif sys.argv[i] == "--cwd" and i + 1 < len(sys.argv):
-                    cwd = sys.argv[i + 1]
-                    i += 2
-                elif not sys.argv[i].startswith("--"):
-                    agent = sys.argv[i]
-                    i += 1
-                else:
-                    i += 1
-            cmd_agents_spawn(agent, prompt, cwd)
-        elif sub == "stop" and sid:
-            cmd_agents_stop(sid)
-        elif sub == "status" and sid:
-            cmd_agents_status(sid)
-        elif sub == "approve" and sid:
-            cmd_agents_approve(sid)
-        elif sub == "reject" and sid:
-            cmd_agents_reject(sid)
-        elif sub == "send" and sid and len(sys.argv) > 4:
-            cmd_agents_send(sid, " ".join(sys.argv[4:]))
-        elif sub == "interrupt" and sid:
-            cmd_agents_interrupt(sid)
-        elif sub == "events" and sid:
-            cmd_agents_events(sid)
-        else:
-            print("Usage: agent-notify agents <list|spawn|stop|status|approve|reject|send|interrupt|events> [SESSION_ID] [args]", file=sys.stderr)
-            sys.exit(1)
-
-    elif group == "messages":
-        if sub == "list":
-            cmd_messages_list()
-        elif sub == "send" and len(sys.argv) >= 6:
-            msg_type = sys.argv[6] if len(sys.argv) > 6 else "handoff"
-            cmd_messages_send(sys.argv[3], sys.argv[4], sys.argv[5], msg_type)
-        elif sub == "approve" and len(sys.argv) > 3:
-            cmd_messages_approve(sys.argv[3])
-        elif sub == "reject" and len(sys.argv) > 3:
-            cmd_messages_reject(sys.argv[3])
-        else:
-            print("Usage: agent-notify messages <list|send FROM TO CONTENT [TYPE]|approve ID|reject ID>", file=sys.stderr)
-            sys.exit(1)
-
-    elif group == "rules":
-        if sub == "list":
-            cmd_rules_list()
-        elif sub == "add" and len(sys.argv) >= 7:
-            cmd_rules_add(sys.argv[3], sys.argv[4], sys.argv[5], sys.argv[6])
-        elif sub == "remove" and len(sys.argv) > 3:
-            cmd_rules_remove(sys.argv[3])
-        else:
-            print("Usage: agent-notify rules <list|add FROM TO EVENT_TYPE ACTION|remove ID>", file=sys.stderr)
-            sys.exit(1)
-
-    elif group == "guard":
-        if sub == "install":
-            cmd_guard_install()
-        elif sub == "status":
-            cmd_guard_status()
-        else:
-            print("Usage: agent-notify guard <install|status>", file=sys.stderr)
-            sys.exit(1)
-
-    elif group == "mcp":
-        if sub == "install":
-            scope = "user"
-            if len(sys.argv) > 3 and sys.argv[3] == "--scope" and len(sys.argv) > 4:
-                scope = sys.argv[4]
-            cmd_mcp_install(scope)
-        elif sub == "serve":
-            # Run the MCP server directly
-            from .mcp import main as mcp_main
-            mcp_main()
-        else:
-            print("Usage: agent-notify mcp <install [--scope user|project]|serve>", file=sys.stderr)
-            sys.exit(1)
+    entry = _DISPATCH.get((group, sub))
+    if entry is not None:
+        min_args, handler = entry
+        if len(sys.argv) - 3 >= min_args:
+            handler(sys.argv)
+            return
 
-    else:
-        print(f"Unknown command group: {group}", file=sys.stderr)
-        _usage()
+    if group in _GROUP_USAGE:
+        print(_GROUP_USAGE[group], file=sys.stderr)
         sys.exit(1)
 
+    print(f"Unknown command group: {group}", file=sys.stderr)
+    _usage()
+    sys.exit(1)
+
 
 def cmd_guard_install() -> None:
     """Install the completion guard as a Claude Code Stop hook."""
-    script_dir = Path(__file__).resolve().parent
-    guard_path = str(script_dir / "guard.py")
+    from pathlib import Path
+
+    guard_path = os.path.join(_SCRIPT_DIR, "guard.py")
 
     settings_path = Path.home() / ".claude" / "settings.json"
     settings = {}
@@ -523,7 +651,7 @@ def cmd_guard_install() -> None:
     })
 
     settings_path.parent.mkdir(parents=True, exist_ok=True)
-    settings_path.write_text(json.dumps(settings, indent=2) + "\n")
+    settings_path.write_bytes(_dumps_pretty(settings) + b"\n")
     print(f"Completion guard installed in {settings_path}")
     print(f"  command: {guard_cmd}")
     print()
@@ -537,6 +665,8 @@ def cmd_guard_install() -> None:
 
 def cmd_guard_status() -> None:
     """Show completion guard status."""
+    from pathlib import Path
+
     counter_dir = Path("/tmp/agent-notify-guard")
     if not counter_dir.exists():
         print("No active guard sessions")
@@ -559,8 +689,10 @@ def cmd_guard_status() -> None:
 
 def cmd_mcp_install(scope: str = "user") -> None:
     """Register the MCP server with Claude Code, Codex, and Gemini."""
-    script_dir = Path(__file__).resolve().parent
-    mcp_path = str(script_dir / "mcp.py")
+    import shutil
+    from pathlib import Path
+
+    mcp_path = os.path.join(_SCRIPT_DIR, "mcp.py")
 
     # Claude Code
     claude = shutil.which("claude")
@@ -579,7 +711,7 @@ def cmd_mcp_install(scope: str = "user") -> None:
         print("Claude Code not found (skipped)")
 
     # Generate .mcp.json for Codex and Gemini
-    project_dir = script_dir.parent
+    project_dir = Path(_SCRIPT_DIR).parent
     mcp_config = {
         "mcpServers": {
             "agent-notify": {
@@ -590,9 +722,7 @@ def cmd_mcp_install(scope: str = "user") -> None:
         }
     }
     mcp_json_path = project_dir / ".mcp.json"
-    with open(mcp_json_path, "w") as f:
-        json.dump(mcp_config, f, indent=2)
-        f.write("\n")
+    mcp_json_path.write_bytes(_dumps_pretty(mcp_config) + b"\n")
     print(f"Created {mcp_json_path}")
     print(f"  MCP server: {mcp_path}")
     print(f"  Python: {sys.executable}")
@@ -2,9 +2,41 @@
 
 import json
 import os
+import queue
 import sqlite3
+import threading
+import time
 from pathlib import Path
 
+try:
+    # Optional: C-speed encoder, also used by the CLI when present.
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps_compact(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_compact(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+
+def _iso_now() -> str:
+    """UTC timestamp in the DB's ISO format, without strftime.
+
+    %f-style formatting goes through the slow C locale path per call —
+    integer math plus an f-string is several times faster.
+    """
+    s, us = divmod(time.time_ns() // 1000, 1_000_000)
+    tm = time.gmtime(s)
+    return (
+        f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+        f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}.{us:06d}Z"
+    )
+
+
 DEFAULT_DB_PATH = os.path.join(Path.home(), ".codex", "daemon.db")
 
 _SCHEMA = """
@@ -37,7 +69,7 @@ CREATE TABLE IF NOT EXISTS agent_sessions (
     last_heartbeat    TEXT NOT NULL DEFAULT '',
     ended_at          TEXT NOT NULL DEFAULT '',
     event_count       INTEGER NOT NULL DEFAULT 0
-);
+) WITHOUT ROWID;
 
 CREATE TABLE IF NOT EXISTS preferences (
     key         TEXT PRIMARY KEY,
@@ -75,7 +107,16 @@ CREATE TABLE IF NOT EXISTS tasks (
     priority      TEXT NOT NULL DEFAULT 'medium',
     dependencies  TEXT NOT NULL DEFAULT '[]',
     created_at    TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
-    updated_at    TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now'))
+    updated_at    TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
+    priority_rank INTEGER GENERATED ALWAYS AS
+                  (CASE priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1
+                   WHEN 'low' THEN 2 ELSE 3 END) VIRTUAL
+);
+
+CREATE TABLE IF NOT EXISTS task_deps (
+    task_id     INTEGER NOT NULL,
+    dep_id      INTEGER NOT NULL,
+    PRIMARY KEY (task_id, dep_id)
 );
 
 CREATE TABLE IF NOT EXISTS context (
@@ -98,7 +139,9 @@ _STATUS_MAP = {
     "stop": "ended",
 }
 
-# Migration: add columns that may not exist in older databases
+# Migration: add columns that may not exist in older databases. The list is
+# append-only; PRAGMA user_version records how many entries a database has
+# already applied, so startup skips straight past them.
 _MIGRATIONS = [
     "ALTER TABLE events ADD COLUMN parent_session_id TEXT NOT NULL DEFAULT ''",
     "ALTER TABLE events ADD COLUMN work_summary TEXT NOT NULL DEFAULT ''",
@@ -127,29 +170,168 @@ _MIGRATIONS = [
     )""",
     "ALTER TABLE coordination_rules ADD COLUMN priority INTEGER NOT NULL DEFAULT 0",
     "ALTER TABLE coordination_rules ADD COLUMN template TEXT NOT NULL DEFAULT ''",
+    """CREATE TABLE IF NOT EXISTS task_deps (
+        task_id INTEGER NOT NULL,
+        dep_id INTEGER NOT NULL,
+        PRIMARY KEY (task_id, dep_id)
+    )""",
+    # VIRTUAL (not STORED) so the column can be added by ALTER TABLE.
+    """ALTER TABLE tasks ADD COLUMN priority_rank INTEGER GENERATED ALWAYS AS
+        (CASE priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1
+         WHEN 'low' THEN 2 ELSE 3 END) VIRTUAL""",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_rank ON tasks(status, priority_rank, id)",
 ]
 
+# Applied once on the shared connection. WAL + NORMAL sync keeps single
+# writes to one WAL frame; mmap and the enlarged page cache keep the hot
+# B-trees addressable without per-query pread calls.
+_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=1073741824;
+PRAGMA cache_size=-65536;
+"""
+
+
+# Hot-path SQL hoisted to module scope: one interned string per statement
+# keeps sqlite3's statement cache keyed on identical text across calls.
+# Everything except the terminal JSON blob, which no event reader consumes
+# (sessions carry the live copy). Keeping it out of list scans saves
+# materializing and re-serializing it per row.
+_EVENT_LIST_COLS = (
+    "id, agent_name, session_id, parent_session_id, category, title, "
+    "message, project_cwd, git_branch, work_summary, created_at"
+)
+
+# Memoized list-query SQL keyed by filter-shape bitmask: the clause list
+# and f-string assembly run once per shape instead of per call, and the
+# connection's statement cache (keyed by SQL text) sees the same string
+# every time.
+_LIST_EVENTS_SQL: dict[int, str] = {}
+_LIST_MESSAGES_SQL: dict[int, str] = {}
+_LIST_TASKS_SQL: dict[int, str] = {}
+
+_INSERT_EVENT_SQL = """INSERT INTO events (agent_name, session_id, parent_session_id,
+   category, title, message, project_cwd, git_branch, terminal,
+   work_summary)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+_UPSERT_SESSION_SQL = """INSERT INTO agent_sessions
+   (session_id, parent_session_id, agent_name, project_cwd,
+    git_branch, terminal, status, last_event, event_count)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
+   ON CONFLICT(session_id) DO UPDATE SET
+     agent_name  = excluded.agent_name,
+     parent_session_id = CASE WHEN excluded.parent_session_id != ''
+                              THEN excluded.parent_session_id
+                              ELSE agent_sessions.parent_session_id END,
+     project_cwd = CASE WHEN excluded.project_cwd != ''
+                        THEN excluded.project_cwd
+                        ELSE agent_sessions.project_cwd END,
+     git_branch  = CASE WHEN excluded.git_branch != ''
+                        THEN excluded.git_branch
+                        ELSE agent_sessions.git_branch END,
+     terminal    = CASE WHEN excluded.terminal != '{}'
+                        THEN excluded.terminal
+                        ELSE agent_sessions.terminal END,
+     status      = ?,
+     last_event  = excluded.last_event,
+     last_seen   = strftime('%Y-%m-%dT%H:%M:%fZ','now'),
+     ended_at    = CASE WHEN ? = 'ended'
+                        THEN strftime('%Y-%m-%dT%H:%M:%fZ','now')
+                        ELSE agent_sessions.ended_at END,
+     event_count = agent_sessions.event_count + 1
+"""
+
+_HEARTBEAT_SQL = """UPDATE agent_sessions
+   SET last_heartbeat = strftime('%Y-%m-%dT%H:%M:%fZ','now'),
+       last_seen = strftime('%Y-%m-%dT%H:%M:%fZ','now')
+   WHERE session_id = ?"""
+
+_INSERT_MESSAGE_SQL = """INSERT INTO messages (from_session, to_session, message_type,
+   content, status)
+   VALUES (?, ?, ?, ?, ?)"""
+
+# updated_at comes in as a parameter so the flushed row matches the one
+# already handed out from the context cache.
+_CTX_UPSERT_SQL = """INSERT INTO context (key, scope, value, updated_by, updated_at)
+   VALUES (?, ?, ?, ?, ?)
+   ON CONFLICT(key, scope) DO UPDATE SET
+     value = excluded.value,
+     updated_by = excluded.updated_by,
+     updated_at = excluded.updated_at"""
+
 
 class Database:
     def __init__(self, path: str | None = None):
         self.path = path or os.environ.get("CODEX_NOTIFY_DAEMON_DB", DEFAULT_DB_PATH)
+        # One long-lived connection: per-call connect/close paid file-open,
+        # WAL probing, and a schema-cache rebuild on every query.
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        # coordination_rules changes rarely but is consulted on every event
+        # and message: cache the table (plus per-key match results) in
+        # process memory, invalidated by rule writes.
+        self._rules_cache: list[dict] | None = None
+        self._rules_index: dict | None = None
+        self._match_memo: dict[tuple[str, str, str], dict] = {}
+        # Short-TTL session row cache for the control-plane handlers that
+        # only need agent_name/terminal: entries are dropped by the session
+        # write paths (see get_session_cached).
+        self._session_cache: dict[str, tuple[float, dict]] = {}
+        # Write-through cache of the (small, read-mostly) context table:
+        # reads are dict walks, writes ride the writer thread's batched
+        # commits. Loaded lazily on first context access.
+        self._ctx_cache: dict[tuple[str, str], dict] | None = None
+        # Background writer for fire-and-forget heartbeats (see
+        # heartbeat_async): started by initialize().
+        self._hb_queue: queue.Queue | None = None
+        self._writer_thread: threading.Thread | None = None
 
     def initialize(self) -> None:
         os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        conn = sqlite3.connect(self.path)
-        try:
-            conn.executescript("PRAGMA journal_mode=WAL;\n" + _SCHEMA)
+        conn = self._connect()
+        with self._lock:
+            conn.executescript(_SCHEMA)
+            # Run migrations for existing databases, gated on user_version.
+            # Databases that predate versioning report 0 and take the
+            # try/except path once; after stamping, startups skip the loop.
+            # Migrations run before index creation so indexes always build
+            # against the migrated (and possibly rebuilt) tables.
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < len(_MIGRATIONS):
+                for sql in _MIGRATIONS[version:]:
+                    try:
+                        conn.execute(sql)
+                    except sqlite3.OperationalError:
+                        pass  # column/table already exists (pre-versioning DB)
+                self._rebuild_sessions_without_rowid(conn)
+                # Backfill task_deps from the legacy JSON dependencies
+                # column (idempotent; no-op once rows exist).
+                conn.execute(
+                    """INSERT OR IGNORE INTO task_deps (task_id, dep_id)
+                       SELECT t.id, j.value FROM tasks t, json_each(t.dependencies) j"""
+                )
+                conn.execute(f"PRAGMA user_version = {len(_MIGRATIONS)}")
+            # Events are always listed newest-first: composite (col, id DESC)
+            # indexes satisfy both the filter and the ORDER BY, so SQLite
+            # walks the index instead of sorting. They subsume the old
+            # single-column indexes, which are dropped for write throughput.
+            for old in ("idx_events_agent", "idx_events_category",
+                        "idx_events_session", "idx_events_created"):
+                conn.execute(f"DROP INDEX IF EXISTS {old}")
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_events_agent ON events(agent_name)"
+                "CREATE INDEX IF NOT EXISTS idx_events_agent_id ON events(agent_name, id DESC)"
             )
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_events_category ON events(category)"
+                "CREATE INDEX IF NOT EXISTS idx_events_category_id ON events(category, id DESC)"
             )
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_events_session ON events(session_id)"
+                "CREATE INDEX IF NOT EXISTS idx_events_session_id ON events(session_id, id DESC)"
             )
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_events_created ON events(created_at)"
+                "CREATE INDEX IF NOT EXISTS idx_events_created_id ON events(created_at, id DESC)"
             )
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_messages_status ON messages(status)"
@@ -157,6 +339,13 @@ class Database:
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_messages_to ON messages(to_session)"
             )
+            # The agent-poll query only ever looks at undelivered messages;
+            # a partial index stays small no matter how much delivered
+            # history accumulates.
+            conn.execute(
+                """CREATE INDEX IF NOT EXISTS idx_messages_pending
+                   ON messages(to_session, id DESC) WHERE status = 'pending'"""
+            )
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_sessions_parent ON agent_sessions(parent_session_id)"
             )
@@ -169,59 +358,214 @@ class Database:
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_context_scope ON context(scope)"
             )
-            # Run migrations for existing databases
-            for sql in _MIGRATIONS:
-                try:
-                    conn.execute(sql)
-                except sqlite3.OperationalError:
-                    pass  # column/table already exists
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_rules_match ON coordination_rules(from_agent, to_agent, event_type)"
+            )
+            # Partial expression index for stale_sessions: only live
+            # sessions are indexed, keyed on the effective-liveness
+            # timestamp, so the staleness probe is a range scan.
+            conn.execute(
+                """CREATE INDEX IF NOT EXISTS idx_sessions_stale ON agent_sessions(
+                     (CASE WHEN last_heartbeat != '' THEN last_heartbeat
+                      ELSE last_seen END))
+                   WHERE status IN ('active', 'waiting')"""
+            )
             conn.commit()
-        finally:
-            conn.close()
+        self._start_writer()
+
+    def _start_writer(self) -> None:
+        if self._writer_thread is None:
+            self._hb_queue = queue.Queue()
+            self._writer_thread = threading.Thread(
+                target=self._writer_loop, name="db-writer", daemon=True
+            )
+            self._writer_thread.start()
+
+    def _writer_loop(self) -> None:
+        """Drain queued writes, coalescing bursts into one commit.
+
+        Heartbeats are the highest-frequency write and carry no payload
+        beyond the session id, so N queued ticks collapse into one
+        transaction (and duplicate ids into one UPDATE). Context upserts
+        ride the same queue as parameter tuples; duplicate keys collapse
+        to the latest value.
+        """
+        q = self._hb_queue
+        while True:
+            item = q.get()
+            stop = item is None
+            heartbeats: set = set()
+            ctx_writes: dict = {}
+            if not stop:
+                if isinstance(item, tuple):
+                    ctx_writes[item[:2]] = item
+                else:
+                    heartbeats.add(item)
+            pulled = 1
+            while not stop and len(heartbeats) + len(ctx_writes) < 256:
+                try:
+                    nxt = q.get_nowait()
+                except queue.Empty:
+                    break
+                pulled += 1
+                if nxt is None:
+                    stop = True
+                elif isinstance(nxt, tuple):
+                    ctx_writes[nxt[:2]] = nxt
+                else:
+                    heartbeats.add(nxt)
+            if heartbeats or ctx_writes:
+                conn = self._connect()
+                with self._lock:
+                    try:
+                        if heartbeats:
+                            conn.executemany(
+                                _HEARTBEAT_SQL, [(sid,) for sid in heartbeats]
+                            )
+                        if ctx_writes:
+                            conn.executemany(
+                                _CTX_UPSERT_SQL, list(ctx_writes.values())
+                            )
+                        conn.commit()
+                    except sqlite3.Error:
+                        pass  # queued writes are best-effort
+            for _ in range(pulled):
+                q.task_done()
+            if stop:
+                return
+
+    @staticmethod
+    def _rebuild_sessions_without_rowid(conn: sqlite3.Connection) -> None:
+        """One-time rebuild of agent_sessions as WITHOUT ROWID.
+
+        session_id is already the primary key; storing rows directly in the
+        PK B-tree drops one indirection per lookup — heartbeats and session
+        upserts are text-keyed point queries.
+        """
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='agent_sessions'"
+        ).fetchone()
+        if not row or "WITHOUT ROWID" in row[0]:
+            return
+        conn.execute("ALTER TABLE agent_sessions RENAME TO agent_sessions_rowid")
+        conn.executescript(_SCHEMA)  # recreates agent_sessions; rest is no-op
+        conn.execute(
+            """INSERT INTO agent_sessions
+               (session_id, parent_session_id, agent_name, project_cwd,
+                git_branch, terminal, status, last_event, first_seen,
+                last_seen, last_heartbeat, ended_at, event_count)
+               SELECT session_id, parent_session_id, agent_name, project_cwd,
+                      git_branch, terminal, status, last_event, first_seen,
+                      last_seen, last_heartbeat, ended_at, event_count
+               FROM agent_sessions_rowid"""
+        )
+        conn.execute("DROP TABLE agent_sessions_rowid")
+
+    def close(self) -> None:
+        if self._writer_thread is not None:
+            self._hb_queue.put(None)  # sentinel: drain and exit
+            self._writer_thread.join(timeout=2)
+            self._writer_thread = None
+            self._hb_queue = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    try:
+                        fresh = os.path.getsize(self.path) == 0
+                    except OSError:
+                        fresh = True
+                    conn = sqlite3.connect(
+                        self.path, check_same_thread=False, cached_statements=512
+                    )
+                    conn.row_factory = sqlite3.Row
+                    if fresh:
+                        # Only effective before the first page is written
+                        # (and before WAL mode is set): 8K pages halve the
+                        # B-tree depth for our row sizes.
+                        conn.execute("PRAGMA page_size=8192")
+                    conn.executescript(_PRAGMAS)
+                    self._conn = conn
+        return self._conn
 
-    def insert_event(self, data: dict) -> int:
+    def _execute_raw(self, sql: str, params=()) -> sqlite3.Cursor:
+        """Execute a read returning plain tuples, skipping Row wrapping.
+
+        For internal callers that pick fields by position; JSON-API
+        boundaries keep the dict-returning methods.
+        """
+        cur = self._connect().execute(sql, params)
+        cur.row_factory = None
+        return cur
+
+    @staticmethod
+    def _event_row(data: dict) -> tuple:
         terminal = data.get("terminal", {})
         if isinstance(terminal, dict):
-            terminal = json.dumps(terminal)
+            terminal = _dumps_compact(terminal)
+        return (
+            data.get("agent_name", ""),
+            data.get("session_id", ""),
+            data.get("parent_session_id", ""),
+            data.get("category", "completion"),
+            data.get("title", ""),
+            data.get("message", ""),
+            data.get("project_cwd", ""),
+            data.get("git_branch", ""),
+            terminal,
+            data.get("work_summary", ""),
+        )
+
+    def insert_event(self, data: dict) -> int:
+        return self.insert_events([data])[0]
+
+    def insert_events(self, batch: list[dict]) -> list[int]:
+        """Insert a batch of events in one transaction. Returns their ids.
+
+        Bursty ingestion pays one WAL flush for the whole batch instead of
+        one commit (and fsync) per event.
+        """
+        rows = [self._event_row(data) for data in batch]
+        ids = []
         conn = self._connect()
-        try:
-            cur = conn.execute(
-                """INSERT INTO events (agent_name, session_id, parent_session_id,
-                   category, title, message, project_cwd, git_branch, terminal,
-                   work_summary)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    data.get("agent_name", ""),
-                    data.get("session_id", ""),
-                    data.get("parent_session_id", ""),
-                    data.get("category", "completion"),
-                    data.get("title", ""),
-                    data.get("message", ""),
-                    data.get("project_cwd", ""),
-                    data.get("git_branch", ""),
-                    terminal,
-                    data.get("work_summary", ""),
-                ),
-            )
+        with self._lock:
+            for row in rows:
+                cur = conn.execute(_INSERT_EVENT_SQL, row)
+                ids.append(cur.lastrowid)
             conn.commit()
-            return cur.lastrowid
-        finally:
-            conn.close()
+        return ids
 
-    def get_event(self, event_id: int) -> dict | None:
+    def record_event(self, data: dict) -> dict:
+        """Insert an event and upsert its session in one transaction.
+
+        The hottest write path in the daemon: one commit (one WAL flush)
+        instead of the two paid by insert_event + upsert_session.
+        Returns the inserted row via RETURNING so callers never re-read
+        what they just wrote.
+        """
+        row = self._event_row(data)
+        session_params = self._session_params(data)
         conn = self._connect()
-        try:
-            row = conn.execute(
-                "SELECT * FROM events WHERE id = ?", (event_id,)
-            ).fetchone()
-            return dict(row) if row else None
-        finally:
-            conn.close()
+        with self._lock:
+            cur = conn.execute(_INSERT_EVENT_SQL + " RETURNING *", row)
+            inserted = cur.fetchone()
+            if session_params:
+                conn.execute(_UPSERT_SESSION_SQL, session_params)
+            conn.commit()
+        if session_params:
+            self._session_cache.pop(session_params[0], None)
+        return dict(inserted)
+
+    def get_event(self, event_id: int) -> dict | None:
+        row = self._connect().execute(
+            "SELECT * FROM events WHERE id = ?", (event_id,)
+        ).fetchone()
+        return dict(row) if row else None
 
     def list_events(
         self,
@@ -231,219 +575,235 @@ class Database:
         since: str | None = None,
         limit: int = 50,
     ) -> list[dict]:
-        clauses = []
-        params: list = []
-        if agent:
-            clauses.append("agent_name = ?")
-            params.append(agent)
-        if category:
-            clauses.append("category = ?")
-            params.append(category)
-        if project:
-            clauses.append("project_cwd LIKE ?")
-            params.append(f"%{project}%")
-        if since:
-            clauses.append("created_at >= ?")
-            params.append(since)
-        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
-        limit = min(max(limit, 1), 1000)
-        params.append(limit)
-        conn = self._connect()
-        try:
-            rows = conn.execute(
-                f"SELECT * FROM events{where} ORDER BY id DESC LIMIT ?", params
-            ).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            conn.close()
+        mask = bool(agent) | bool(category) << 1 | bool(project) << 2 | bool(since) << 3
+        sql = _LIST_EVENTS_SQL.get(mask)
+        if sql is None:
+            clauses = []
+            if mask & 1:
+                clauses.append("agent_name = ?")
+            if mask & 2:
+                clauses.append("category = ?")
+            if mask & 4:
+                clauses.append("project_cwd LIKE ?")
+            if mask & 8:
+                clauses.append("created_at >= ?")
+            where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+            sql = _LIST_EVENTS_SQL[mask] = (
+                f"SELECT {_EVENT_LIST_COLS} FROM events{where} ORDER BY id DESC LIMIT ?"
+            )
+        params = [
+            v for v in (agent, category, project and f"%{project}%", since) if v
+        ]
+        params.append(min(max(limit, 1), 1000))
+        rows = self._connect().execute(sql, params).fetchall()
+        return [dict(r) for r in rows]
 
-    def upsert_session(self, data: dict) -> None:
+    @staticmethod
+    def _session_params(data: dict) -> tuple | None:
         session_id = data.get("session_id", "")
         if not session_id:
-            return
+            return None
         category = data.get("category", "completion")
         status = _STATUS_MAP.get(category, "active")
         terminal = data.get("terminal", {})
         if isinstance(terminal, dict):
-            terminal = json.dumps(terminal)
-        parent = data.get("parent_session_id", "")
+            terminal = _dumps_compact(terminal)
+        return (
+            session_id,
+            data.get("parent_session_id", ""),
+            data.get("agent_name", ""),
+            data.get("project_cwd", ""),
+            data.get("git_branch", ""),
+            terminal,
+            status,
+            category,
+            status,
+            status,
+        )
+
+    def upsert_session(self, data: dict) -> None:
+        params = self._session_params(data)
+        if params is None:
+            return
         conn = self._connect()
-        try:
-            conn.execute(
-                """INSERT INTO agent_sessions
-                   (session_id, parent_session_id, agent_name, project_cwd,
-                    git_branch, terminal, status, last_event, event_count)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
-                   ON CONFLICT(session_id) DO UPDATE SET
-                     agent_name  = excluded.agent_name,
-                     parent_session_id = CASE WHEN excluded.parent_session_id != ''
-                                              THEN excluded.parent_session_id
-                                              ELSE agent_sessions.parent_session_id END,
-                     project_cwd = CASE WHEN excluded.project_cwd != ''
-                                        THEN excluded.project_cwd
-                                        ELSE agent_sessions.project_cwd END,
-                     git_branch  = CASE WHEN excluded.git_branch != ''
-                                        THEN excluded.git_branch
-                                        ELSE agent_sessions.git_branch END,
-                     terminal    = CASE WHEN excluded.terminal != '{}'
-                                        THEN excluded.terminal
-                                        ELSE agent_sessions.terminal END,
-                     status      = ?,
-                     last_event  = excluded.last_event,
-                     last_seen   = strftime('%Y-%m-%dT%H:%M:%fZ','now'),
-                     ended_at    = CASE WHEN ? = 'ended'
-                                        THEN strftime('%Y-%m-%dT%H:%M:%fZ','now')
-                                        ELSE agent_sessions.ended_at END,
-                     event_count = agent_sessions.event_count + 1
-                """,
-                (
-                    session_id,
-                    parent,
-                    data.get("agent_name", ""),
-                    data.get("project_cwd", ""),
-                    data.get("git_branch", ""),
-                    terminal,
-                    status,
-                    category,
-                    status,
-                    status,
-                ),
-            )
+        with self._lock:
+            conn.execute(_UPSERT_SESSION_SQL, params)
             conn.commit()
-        finally:
-            conn.close()
+        self._session_cache.pop(params[0], None)
 
     def heartbeat(self, session_id: str) -> bool:
         """Update last_heartbeat and last_seen for a session. Returns True if found."""
         conn = self._connect()
-        try:
-            conn.execute(
-                """UPDATE agent_sessions
-                   SET last_heartbeat = strftime('%Y-%m-%dT%H:%M:%fZ','now'),
-                       last_seen = strftime('%Y-%m-%dT%H:%M:%fZ','now')
-                   WHERE session_id = ?""",
-                (session_id,),
-            )
+        with self._lock:
+            cur = conn.execute(_HEARTBEAT_SQL, (session_id,))
             conn.commit()
-            return conn.total_changes > 0
-        finally:
-            conn.close()
+            return cur.rowcount > 0
+
+    def heartbeat_async(self, session_id: str) -> bool:
+        """Existence-checked, fire-and-forget heartbeat.
+
+        The caller pays an indexed point read instead of a commit; the
+        actual timestamp update is flushed by the writer thread, which
+        coalesces bursts. Returns True if the session exists.
+        """
+        if self._hb_queue is None:
+            return self.heartbeat(session_id)
+        row = self._execute_raw(
+            "SELECT 1 FROM agent_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return False
+        self._hb_queue.put(session_id)
+        return True
 
     def child_sessions(self, parent_session_id: str) -> list[dict]:
         """Get all sub-agent sessions for a parent."""
+        rows = self._connect().execute(
+            "SELECT * FROM agent_sessions WHERE parent_session_id = ? ORDER BY first_seen",
+            (parent_session_id,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def list_sessions(self, status: str | None = None) -> list[dict]:
         conn = self._connect()
-        try:
+        if status:
+            rows = conn.execute(
+                "SELECT * FROM agent_sessions WHERE status = ? ORDER BY last_seen DESC",
+                (status,),
+            ).fetchall()
+        else:
             rows = conn.execute(
-                "SELECT * FROM agent_sessions WHERE parent_session_id = ? ORDER BY first_seen",
-                (parent_session_id,),
+                "SELECT * FROM agent_sessions ORDER BY last_seen DESC"
             ).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            conn.close()
+        return [dict(r) for r in rows]
 
-    def list_sessions(self, status: str | None = None) -> list[dict]:
-        conn = self._connect()
-        try:
-            if status:
-                rows = conn.execute(
-                    "SELECT * FROM agent_sessions WHERE status = ? ORDER BY last_seen DESC",
-                    (status,),
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT * FROM agent_sessions ORDER BY last_seen DESC"
-                ).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            conn.close()
+    def session_counts(self) -> tuple[int, int]:
+        """(total, active-or-waiting) session counts in one aggregate."""
+        row = self._execute_raw(
+            """SELECT COUNT(*),
+                      COALESCE(SUM(status IN ('active', 'waiting')), 0)
+               FROM agent_sessions"""
+        ).fetchone()
+        return row[0], row[1]
 
     def get_session(self, session_id: str) -> dict | None:
-        conn = self._connect()
-        try:
-            row = conn.execute(
-                "SELECT * FROM agent_sessions WHERE session_id = ?", (session_id,)
-            ).fetchone()
-            return dict(row) if row else None
-        finally:
-            conn.close()
+        row = self._connect().execute(
+            "SELECT * FROM agent_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if not row:
+            return None
+        d = dict(row)
+        # Parse the terminal descriptor once here so delivery paths don't
+        # each re-decode the same JSON string per message.
+        term = d.get("terminal")
+        if isinstance(term, str) and term:
+            try:
+                d["_terminal_obj"] = _loads(term)
+            except (ValueError, TypeError):
+                pass
+        return d
+
+    def get_session_cached(self, session_id: str, ttl: float = 1.0) -> dict | None:
+        """get_session with a short per-process TTL.
+
+        For control-plane handlers that only read agent_name/terminal from
+        the row: a dashboard hammering one agent hits the cache instead of
+        SQLite on every approve/send/interrupt. Session writes drop the
+        entry, so the TTL only bounds staleness of timestamp fields.
+        Callers must not mutate the returned dict.
+        """
+        now = time.monotonic()
+        entry = self._session_cache.get(session_id)
+        if entry is not None and now - entry[0] < ttl:
+            return entry[1]
+        session = self.get_session(session_id)
+        if session is not None:
+            self._session_cache[session_id] = (now, session)
+        return session
 
     def session_events(self, session_id: str, limit: int = 50) -> list[dict]:
-        conn = self._connect()
-        try:
-            rows = conn.execute(
-                "SELECT * FROM events WHERE session_id = ? ORDER BY id DESC LIMIT ?",
-                (session_id, min(max(limit, 1), 1000)),
-            ).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            conn.close()
+        rows = self._connect().execute(
+            f"SELECT {_EVENT_LIST_COLS} FROM events WHERE session_id = ? "
+            f"ORDER BY id DESC LIMIT ?",
+            (session_id, min(max(limit, 1), 1000)),
+        ).fetchall()
+        return [dict(r) for r in rows]
 
     def stale_sessions(self, seconds: int = 300) -> list[dict]:
-        conn = self._connect()
-        try:
-            # Use last_heartbeat if available, otherwise last_seen
-            rows = conn.execute(
-                """SELECT * FROM agent_sessions
-                   WHERE status IN ('active', 'waiting')
-                     AND COALESCE(NULLIF(last_heartbeat, ''), last_seen)
-                         < strftime('%Y-%m-%dT%H:%M:%fZ', 'now', ? || ' seconds')
-                   ORDER BY last_seen ASC""",
-                (f"-{seconds}",),
-            ).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            conn.close()
+        # Use last_heartbeat if available, otherwise last_seen. The CASE
+        # expression matches idx_sessions_stale so the probe is an index
+        # range scan over live sessions only.
+        rows = self._connect().execute(
+            """SELECT * FROM agent_sessions
+               WHERE status IN ('active', 'waiting')
+                 AND (CASE WHEN last_heartbeat != '' THEN last_heartbeat
+                      ELSE last_seen END)
+                     < strftime('%Y-%m-%dT%H:%M:%fZ', 'now', ? || ' seconds')
+               ORDER BY last_seen ASC""",
+            (f"-{seconds}",),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def sessions_with_idle_seconds(self) -> list[dict]:
+        """Live sessions plus an `idle` column (seconds since last
+        heartbeat/event), idlest first. One query replaces a per-threshold
+        stale_sessions probe: the caller classifies each row against its
+        thresholds and can stop at the first non-idle row."""
+        rows = self._connect().execute(
+            """SELECT *,
+                      CAST(strftime('%s', 'now') AS INTEGER)
+                      - CAST(strftime('%s',
+                            CASE WHEN last_heartbeat != '' THEN last_heartbeat
+                                 ELSE last_seen END) AS INTEGER) AS idle
+               FROM agent_sessions
+               WHERE status IN ('active', 'waiting')
+               ORDER BY idle DESC""",
+        ).fetchall()
+        return [dict(r) for r in rows]
 
     # --- Preferences ---
 
     def get_preference(self, key: str) -> str | None:
-        conn = self._connect()
-        try:
-            row = conn.execute(
-                "SELECT value FROM preferences WHERE key = ?", (key,)
-            ).fetchone()
-            return row["value"] if row else None
-        finally:
-            conn.close()
+        row = self._connect().execute(
+            "SELECT value FROM preferences WHERE key = ?", (key,)
+        ).fetchone()
+        return row["value"] if row else None
 
     def set_preference(self, key: str, value: str) -> None:
         conn = self._connect()
-        try:
+        with self._lock:
             conn.execute(
                 """INSERT INTO preferences (key, value) VALUES (?, ?)
                    ON CONFLICT(key) DO UPDATE SET value = excluded.value""",
                 (key, value),
             )
             conn.commit()
-        finally:
-            conn.close()
 
     def list_preferences(self) -> dict:
-        conn = self._connect()
-        try:
-            rows = conn.execute("SELECT * FROM preferences ORDER BY key").fetchall()
-            return {r["key"]: r["value"] for r in rows}
-        finally:
-            conn.close()
+        return dict(
+            self._execute_raw("SELECT key, value FROM preferences ORDER BY key")
+        )
 
     def delete_preference(self, key: str) -> bool:
         conn = self._connect()
-        try:
-            conn.execute("DELETE FROM preferences WHERE key = ?", (key,))
+        with self._lock:
+            cur = conn.execute("DELETE FROM preferences WHERE key = ?", (key,))
             conn.commit()
-            return conn.total_changes > 0
-        finally:
-            conn.close()
+            return cur.rowcount > 0
 
     # --- Messages (agent mesh) ---
 
-    def insert_message(self, data: dict) -> int:
+    def insert_message(self, data: dict) -> dict:
+        """Insert a message and return the full row.
+
+        RETURNING hands back the inserted row (id, defaulted columns,
+        created_at) in the same call, so callers never re-read what they
+        just wrote.
+        """
         conn = self._connect()
-        try:
+        with self._lock:
             cur = conn.execute(
-                """INSERT INTO messages (from_session, to_session, message_type,
-                   content, status)
-                   VALUES (?, ?, ?, ?, ?)""",
+                _INSERT_MESSAGE_SQL + " RETURNING *",
                 (
                     data.get("from_session", ""),
                     data.get("to_session", ""),
@@ -452,63 +812,114 @@ class Database:
                     data.get("status", "pending"),
                 ),
             )
+            row = cur.fetchone()
             conn.commit()
-            return cur.lastrowid
-        finally:
-            conn.close()
+        return dict(row)
 
-    def get_message(self, message_id: int) -> dict | None:
-        conn = self._connect()
-        try:
-            row = conn.execute(
-                "SELECT * FROM messages WHERE id = ?", (message_id,)
-            ).fetchone()
-            return dict(row) if row else None
-        finally:
-            conn.close()
-
-    def list_messages(self, status: str | None = None, limit: int = 50) -> list[dict]:
+    def insert_messages(self, batch: list[dict]) -> int:
+        """Insert a batch of messages in one transaction. Returns the count.
+
+        Fan-out (one handoff to N recipients) pays one commit instead of N.
+        """
+        rows = [
+            (
+                data.get("from_session", ""),
+                data.get("to_session", ""),
+                data.get("message_type", "handoff"),
+                data.get("content", ""),
+                data.get("status", "pending"),
+            )
+            for data in batch
+        ]
         conn = self._connect()
-        try:
-            if status:
-                rows = conn.execute(
-                    "SELECT * FROM messages WHERE status = ? ORDER BY id DESC LIMIT ?",
-                    (status, min(max(limit, 1), 1000)),
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT * FROM messages ORDER BY id DESC LIMIT ?",
-                    (min(max(limit, 1), 1000),),
-                ).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            conn.close()
+        with self._lock:
+            conn.executemany(_INSERT_MESSAGE_SQL, rows)
+            conn.commit()
+        return len(rows)
+
+    def get_message(self, message_id: int) -> dict | None:
+        row = self._connect().execute(
+            "SELECT * FROM messages WHERE id = ?", (message_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def list_messages(
+        self,
+        status: str | None = None,
+        limit: int = 50,
+        to_session: str | None = None,
+    ) -> list[dict]:
+        mask = bool(status) | bool(to_session) << 1
+        sql = _LIST_MESSAGES_SQL.get(mask)
+        if sql is None:
+            clauses = []
+            if mask & 1:
+                clauses.append("status = ?")
+            if mask & 2:
+                clauses.append("to_session = ?")
+            where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+            sql = _LIST_MESSAGES_SQL[mask] = (
+                f"SELECT * FROM messages{where} ORDER BY id DESC LIMIT ?"
+            )
+        params = [v for v in (status, to_session) if v]
+        params.append(min(max(limit, 1), 1000))
+        rows = self._connect().execute(sql, params).fetchall()
+        return [dict(r) for r in rows]
 
     def update_message_status(
         self, message_id: int, status: str, delivered_at: str | None = None
     ) -> bool:
         conn = self._connect()
-        try:
+        with self._lock:
             if delivered_at:
-                conn.execute(
+                cur = conn.execute(
                     "UPDATE messages SET status = ?, delivered_at = ? WHERE id = ?",
                     (status, delivered_at, message_id),
                 )
             else:
-                conn.execute(
+                cur = conn.execute(
                     "UPDATE messages SET status = ? WHERE id = ?",
                     (status, message_id),
                 )
             conn.commit()
-            return conn.total_changes > 0
-        finally:
-            conn.close()
+            return cur.rowcount > 0
 
     # --- Coordination rules ---
 
+    def _invalidate_rules_cache(self) -> None:
+        self._rules_cache = None
+        self._rules_index = None
+        self._match_memo.clear()
+
+    def _cached_rules(self) -> list[dict]:
+        rules = self._rules_cache
+        if rules is None:
+            rows = self._connect().execute(
+                "SELECT * FROM coordination_rules ORDER BY priority DESC, id ASC"
+            ).fetchall()
+            rules = self._rules_cache = [dict(r) for r in rows]
+        return rules
+
+    def _rule_index(self) -> dict:
+        """Three-level trie over the cached rules: from_agent -> to_agent
+        -> event_type -> [rules]. Wildcards sit as literal "*" keys at each
+        level, so a lookup is at most eight dict descents instead of a scan
+        of the whole table. Leaf lists inherit _cached_rules ordering
+        (priority DESC, id ASC)."""
+        index = self._rules_index
+        if index is None:
+            index = {}
+            for rule in self._cached_rules():
+                index.setdefault(rule["from_agent"], {}) \
+                     .setdefault(rule["to_agent"], {}) \
+                     .setdefault(rule["event_type"], []).append(rule)
+            self._rules_index = index
+        return index
+
     def insert_rule(self, data: dict) -> int:
+        self._invalidate_rules_cache()
         conn = self._connect()
-        try:
+        with self._lock:
             cur = conn.execute(
                 """INSERT INTO coordination_rules
                    (from_agent, to_agent, event_type, action, priority, template)
@@ -524,36 +935,47 @@ class Database:
             )
             conn.commit()
             return cur.lastrowid
-        finally:
-            conn.close()
 
     def list_rules(self) -> list[dict]:
-        conn = self._connect()
-        try:
-            rows = conn.execute(
-                "SELECT * FROM coordination_rules ORDER BY id"
-            ).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            conn.close()
+        rows = self._connect().execute(
+            "SELECT * FROM coordination_rules ORDER BY id"
+        ).fetchall()
+        return [dict(r) for r in rows]
 
     def delete_rule(self, rule_id: int) -> bool:
+        self._invalidate_rules_cache()
         conn = self._connect()
-        try:
-            conn.execute("DELETE FROM coordination_rules WHERE id = ?", (rule_id,))
+        with self._lock:
+            cur = conn.execute(
+                "DELETE FROM coordination_rules WHERE id = ?", (rule_id,)
+            )
             conn.commit()
-            return conn.total_changes > 0
-        finally:
-            conn.close()
+            return cur.rowcount > 0
 
     # --- Tasks ---
 
-    def insert_task(self, data: dict) -> int:
-        deps = data.get("dependencies", [])
+    @staticmethod
+    def _parse_deps(deps) -> list:
         if isinstance(deps, list):
-            deps = json.dumps(deps)
-        conn = self._connect()
+            return deps
         try:
+            parsed = json.loads(deps or "[]")
+        except (json.JSONDecodeError, TypeError):
+            return []
+        return parsed if isinstance(parsed, list) else []
+
+    def _replace_task_deps(self, conn: sqlite3.Connection, task_id: int, deps: list) -> None:
+        conn.execute("DELETE FROM task_deps WHERE task_id = ?", (task_id,))
+        if deps:
+            conn.executemany(
+                "INSERT OR IGNORE INTO task_deps (task_id, dep_id) VALUES (?, ?)",
+                [(task_id, dep) for dep in deps],
+            )
+
+    def insert_task(self, data: dict) -> int:
+        deps = self._parse_deps(data.get("dependencies", []))
+        conn = self._connect()
+        with self._lock:
             cur = conn.execute(
                 """INSERT INTO tasks (session_id, title, description, status,
                    priority, dependencies)
@@ -564,66 +986,52 @@ class Database:
                     data.get("description", ""),
                     data.get("status", "pending"),
                     data.get("priority", "medium"),
-                    deps,
+                    _dumps_compact(deps),
                 ),
             )
+            self._replace_task_deps(conn, cur.lastrowid, deps)
             conn.commit()
             return cur.lastrowid
-        finally:
-            conn.close()
 
     def get_task(self, task_id: int) -> dict | None:
-        conn = self._connect()
-        try:
-            row = conn.execute(
-                "SELECT * FROM tasks WHERE id = ?", (task_id,)
-            ).fetchone()
-            if not row:
-                return None
-            d = dict(row)
-            try:
-                d["dependencies"] = json.loads(d.get("dependencies", "[]"))
-            except (json.JSONDecodeError, TypeError):
-                d["dependencies"] = []
-            return d
-        finally:
-            conn.close()
+        row = self._connect().execute(
+            "SELECT * FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        if not row:
+            return None
+        d = dict(row)
+        d["dependencies"] = self._parse_deps(d.get("dependencies"))
+        return d
 
     def list_tasks(
         self,
         session_id: str | None = None,
         status: str | None = None,
         limit: int = 100,
+        parse_deps: bool = True,
     ) -> list[dict]:
-        clauses = []
-        params: list = []
-        if session_id:
-            clauses.append("session_id = ?")
-            params.append(session_id)
-        if status:
-            clauses.append("status = ?")
-            params.append(status)
-        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
-        limit = min(max(limit, 1), 1000)
-        params.append(limit)
-        conn = self._connect()
-        try:
-            rows = conn.execute(
-                f"SELECT * FROM tasks{where} ORDER BY priority = 'high' DESC, "
-                f"priority = 'medium' DESC, id ASC LIMIT ?",
-                params,
-            ).fetchall()
-            result = []
-            for r in rows:
-                d = dict(r)
-                try:
-                    d["dependencies"] = json.loads(d.get("dependencies", "[]"))
-                except (json.JSONDecodeError, TypeError):
-                    d["dependencies"] = []
-                result.append(d)
-            return result
-        finally:
-            conn.close()
+        mask = bool(session_id) | bool(status) << 1
+        sql = _LIST_TASKS_SQL.get(mask)
+        if sql is None:
+            clauses = []
+            if mask & 1:
+                clauses.append("session_id = ?")
+            if mask & 2:
+                clauses.append("status = ?")
+            where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+            sql = _LIST_TASKS_SQL[mask] = (
+                f"SELECT * FROM tasks{where} ORDER BY priority_rank, id ASC LIMIT ?"
+            )
+        params = [v for v in (session_id, status) if v]
+        params.append(min(max(limit, 1), 1000))
+        rows = self._connect().execute(sql, params).fetchall()
+        result = []
+        for r in rows:
+            d = dict(r)
+            if parse_deps:
+                d["dependencies"] = self._parse_deps(d.get("dependencies"))
+            result.append(d)
+        return result
 
     def update_task(self, task_id: int, data: dict) -> bool:
         sets = ["updated_at = strftime('%Y-%m-%dT%H:%M:%fZ','now')"]
@@ -632,143 +1040,184 @@ class Database:
             if field in data:
                 sets.append(f"{field} = ?")
                 params.append(data[field])
+        deps = None
         if "dependencies" in data:
-            deps = data["dependencies"]
-            if isinstance(deps, list):
-                deps = json.dumps(deps)
+            deps = self._parse_deps(data["dependencies"])
             sets.append("dependencies = ?")
-            params.append(deps)
+            params.append(_dumps_compact(deps))
         params.append(task_id)
         conn = self._connect()
-        try:
-            conn.execute(
+        with self._lock:
+            cur = conn.execute(
                 f"UPDATE tasks SET {', '.join(sets)} WHERE id = ?", params
             )
+            found = cur.rowcount > 0
+            if deps is not None and found:
+                self._replace_task_deps(conn, task_id, deps)
             conn.commit()
-            return conn.total_changes > 0
-        finally:
-            conn.close()
+            return found
 
     def delete_task(self, task_id: int) -> bool:
         conn = self._connect()
-        try:
-            conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        with self._lock:
+            cur = conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            found = cur.rowcount > 0
+            conn.execute("DELETE FROM task_deps WHERE task_id = ?", (task_id,))
             conn.commit()
-            return conn.total_changes > 0
-        finally:
-            conn.close()
+            return found
 
     def next_task(self, session_id: str | None = None) -> dict | None:
         """Find the next actionable task: pending, with all dependencies done."""
-        # Get ALL done task IDs (cross-session) for dependency resolution
-        all_tasks = self.list_tasks(limit=1000)
-        done_ids = {t["id"] for t in all_tasks if t["status"] == "done"}
-        # Get candidate tasks (filtered by session if specified)
-        candidates = self.list_tasks(session_id=session_id, limit=500)
-        for t in candidates:
-            if t["status"] != "pending":
-                continue
-            deps = t.get("dependencies", [])
-            if all(d in done_ids for d in deps):
-                return t
-        return None
+        # Dependency-completeness is answered by the task_deps side table in
+        # one statement instead of fetching every task and resolving in Python.
+        clauses = ""
+        params: list = []
+        if session_id:
+            clauses = " AND t.session_id = ?"
+            params.append(session_id)
+        row = self._connect().execute(
+            f"""SELECT t.* FROM tasks t
+                WHERE t.status = 'pending'{clauses}
+                  AND NOT EXISTS (
+                    SELECT 1 FROM task_deps d
+                    JOIN tasks dt ON dt.id = d.dep_id
+                    WHERE d.task_id = t.id AND dt.status != 'done')
+                ORDER BY t.priority_rank, t.id
+                LIMIT 1""",
+            params,
+        ).fetchone()
+        if not row:
+            return None
+        d = dict(row)
+        d["dependencies"] = self._parse_deps(d.get("dependencies"))
+        return d
 
     # --- Context (shared variables) ---
 
+    def _context_cache(self) -> dict[tuple[str, str], dict]:
+        cache = self._ctx_cache
+        if cache is None:
+            rows = self._connect().execute("SELECT * FROM context").fetchall()
+            cache = self._ctx_cache = {
+                (r["key"], r["scope"]): dict(r) for r in rows
+            }
+        return cache
+
     def set_context(self, key: str, value: str, scope: str = "global", updated_by: str = "") -> None:
+        """Update the cache and queue the upsert for the writer thread.
+
+        Agents that use context as a scratchpad issue bursts of small
+        writes; batching them behind the writer thread drops the fsync
+        rate to one per burst instead of one per call.
+        """
+        row = {
+            "key": key,
+            "scope": scope,
+            "value": value,
+            "updated_by": updated_by,
+            "updated_at": _iso_now(),
+        }
+        self._context_cache()[(key, scope)] = row
+        params = (key, scope, value, updated_by, row["updated_at"])
+        if self._hb_queue is not None:
+            self._hb_queue.put(params)
+            return
         conn = self._connect()
-        try:
-            conn.execute(
-                """INSERT INTO context (key, scope, value, updated_by)
-                   VALUES (?, ?, ?, ?)
-                   ON CONFLICT(key, scope) DO UPDATE SET
-                     value = excluded.value,
-                     updated_by = excluded.updated_by,
-                     updated_at = strftime('%Y-%m-%dT%H:%M:%fZ','now')""",
-                (key, scope, value, updated_by),
-            )
+        with self._lock:
+            conn.execute(_CTX_UPSERT_SQL, params)
             conn.commit()
-        finally:
-            conn.close()
 
     def get_context(self, key: str, scope: str = "global") -> dict | None:
-        conn = self._connect()
-        try:
-            row = conn.execute(
-                "SELECT * FROM context WHERE key = ? AND scope = ?",
-                (key, scope),
-            ).fetchone()
-            return dict(row) if row else None
-        finally:
-            conn.close()
+        row = self._context_cache().get((key, scope))
+        return dict(row) if row else None
 
     def list_context(self, scope: str | None = None) -> list[dict]:
-        conn = self._connect()
-        try:
-            if scope:
-                rows = conn.execute(
-                    "SELECT * FROM context WHERE scope = ? ORDER BY key",
-                    (scope,),
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT * FROM context ORDER BY scope, key"
-                ).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            conn.close()
+        cache = self._context_cache()
+        if scope:
+            rows = sorted(
+                (r for (_, s), r in cache.items() if s == scope),
+                key=lambda r: r["key"],
+            )
+        else:
+            rows = sorted(cache.values(), key=lambda r: (r["scope"], r["key"]))
+        return [dict(r) for r in rows]
 
     def delete_context(self, key: str, scope: str = "global") -> bool:
+        existed = self._context_cache().pop((key, scope), None) is not None
+        if self._hb_queue is not None:
+            # A queued upsert for this key must land before the DELETE,
+            # not resurrect the row after it.
+            self._hb_queue.join()
         conn = self._connect()
-        try:
+        with self._lock:
             conn.execute(
                 "DELETE FROM context WHERE key = ? AND scope = ?",
                 (key, scope),
             )
             conn.commit()
-            return conn.total_changes > 0
-        finally:
-            conn.close()
+        return existed
 
     def match_rule(self, from_agent: str, to_agent: str, event_type: str) -> dict:
         """Find the most specific matching coordination rule. Returns full rule dict."""
-        conn = self._connect()
-        try:
-            # Most specific first: exact match > wildcard
-            for fa, ta, et in [
-                (from_agent, to_agent, event_type),
-                (from_agent, to_agent, "*"),
-                (from_agent, "*", event_type),
-                ("*", to_agent, event_type),
-                (from_agent, "*", "*"),
-                ("*", to_agent, "*"),
-                ("*", "*", event_type),
-                ("*", "*", "*"),
-            ]:
-                row = conn.execute(
-                    """SELECT * FROM coordination_rules
-                       WHERE from_agent = ? AND to_agent = ? AND event_type = ?
-                       ORDER BY priority DESC
-                       LIMIT 1""",
-                    (fa, ta, et),
-                ).fetchone()
-                if row:
-                    return dict(row)
-            return {"action": "approve", "template": "", "priority": 0}
-        finally:
-            conn.close()
+        key = (from_agent, to_agent, event_type)
+        cached = self._match_memo.get(key)
+        if cached is not None:
+            return cached
+        # Precedence matches the original probe ladder: a rule with more
+        # exact fields always wins, ties broken by exact from_agent over
+        # to_agent over event_type, then priority. Walk the trie's exact
+        # and wildcard branches — all rules at a leaf share a rank, so
+        # the leaf head (highest priority there) is its only candidate.
+        best = None
+        best_key = (-1, -1, 0)
+        index = self._rule_index()
+        for f in (from_agent, "*"):
+            by_to = index.get(f)
+            if by_to is None:
+                continue
+            for t in (to_agent, "*"):
+                by_event = by_to.get(t)
+                if by_event is None:
+                    continue
+                for e in (event_type, "*"):
+                    rules = by_event.get(e)
+                    if not rules:
+                        continue
+                    rule = rules[0]
+                    f_exact = f != "*"
+                    t_exact = t != "*"
+                    e_exact = e != "*"
+                    rank = (
+                        f_exact + t_exact + e_exact,
+                        f_exact * 4 + t_exact * 2 + e_exact,
+                        rule.get("priority", 0),
+                    )
+                    if rank > best_key:
+                        best = rule
+                        best_key = rank
+        if best is None:
+            best = {"action": "approve", "template": "", "priority": 0}
+        self._match_memo[key] = best
+        return best
 
     def match_rules_for_event(self, agent_name: str, event_type: str) -> list[dict]:
         """Find all rules matching an agent's event. Used for after-work routing."""
-        conn = self._connect()
-        try:
-            rows = conn.execute(
-                """SELECT * FROM coordination_rules
-                   WHERE (from_agent = ? OR from_agent = '*')
-                     AND (event_type = ? OR event_type = '*')
-                   ORDER BY priority DESC, id ASC""",
-                (agent_name, event_type),
-            ).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            conn.close()
+        # Only the exact and wildcard from_agent branches can match; the
+        # to_agent level is irrelevant for event routing, so every branch
+        # under them is walked. Collected leaves come from different trie
+        # paths, so re-sort to the priority DESC, id ASC contract.
+        index = self._rule_index()
+        branches = (agent_name, "*") if agent_name != "*" else ("*",)
+        events = (event_type, "*") if event_type != "*" else ("*",)
+        matched = []
+        for f in branches:
+            by_to = index.get(f)
+            if by_to is None:
+                continue
+            for by_event in by_to.values():
+                for e in events:
+                    rules = by_event.get(e)
+                    if rules:
+                        matched.extend(rules)
+        matched.sort(key=lambda r: (-r.get("priority", 0), r["id"]))
+        return matched
@@ -30,47 +30,178 @@ Counter-based escalation:
     - Set AGENT_NOTIFY_GUARD_MAX=0 for unlimited blocking
 """
 
+import http.client
 import json
 import os
+import random
+import socket
 import sys
-from pathlib import Path
-from urllib.request import urlopen, Request
-from urllib.error import URLError
+import threading
+import time
+
+try:
+    import dbm.gnu as _gdbm  # not built on every platform
+except ImportError:
+    _gdbm = None
 
 DONE_SIGNAL = "AGENT_DONE::"
-COUNTER_DIR = Path("/tmp/agent-notify-guard")
+# Counters are throwaway warm-up state: keep them on tmpfs when the
+# platform has one so each Stop never touches disk writeback. Plain
+# strings + os.path here — pathlib's object layer costs several times
+# the underlying syscall for trivial joins, and this runs every Stop.
+COUNTER_DIR = (
+    "/dev/shm/agent-notify-guard"
+    if os.path.isdir("/dev/shm")
+    else "/tmp/agent-notify-guard"
+)
+# With gdbm available, all sessions share one file instead of an inode
+# apiece — O(1) key ops with built-in locking, and cleanup never has to
+# scan a directory. The per-session files remain as the fallback.
+COUNTER_DB = COUNTER_DIR + ".db"
+# Counters older than this are from abandoned sessions and get swept.
+_COUNTER_TTL = 259200  # 72 hours
 DEFAULT_MAX = 3
 DEFAULT_PORT = 7878
 
+# Environment is fixed for the life of the process: parse once at import
+# instead of re-doing the dict lookup + int() per call site.
+_MAX_BLOCKS = int(os.environ.get("AGENT_NOTIFY_GUARD_MAX", DEFAULT_MAX))
+_DAEMON_PORT = int(os.environ.get("CODEX_NOTIFY_DAEMON_PORT", DEFAULT_PORT))
+
+# Exact bytes the daemon sends when nothing is pending — by far the most
+# common guard_check outcome, recognized without invoking the JSON parser.
+_EMPTY_PENDING = b'{"assigned": [], "global": []}'
+
+_dir_ready = False
+
+# Session whose counter should be cleared once the stop decision is out.
+# The done-signal path sets this instead of unlinking inline, so the
+# allow is not held up by a filesystem syscall.
+_cleanup_session: str | None = None
+
 
 def _read_stdin() -> dict:
     """Read the hook input from stdin."""
+    # Parse straight off the buffered byte stream: no intermediate str
+    # copy, and the JSON parser handles the UTF-8 decode itself.
     try:
-        return json.loads(sys.stdin.read())
-    except (json.JSONDecodeError, ValueError):
+        return json.load(sys.stdin.buffer)
+    except (json.JSONDecodeError, ValueError, UnicodeDecodeError):
         return {}
 
 
+def _gdbm_open(mode: str):
+    """Open the shared counter db, retrying briefly under contention.
+
+    gdbm takes an exclusive writer lock, and concurrent Stop hooks are
+    the normal case for a multi-agent tool. Returns None if the lock
+    stays held so callers fall through to the per-session files instead
+    of silently losing the counter.
+    """
+    for delay in (0, 0.01, 0.04, 0.1):
+        if delay:
+            time.sleep(delay)
+        try:
+            return _gdbm.open(COUNTER_DB, mode)
+        except (_gdbm.error, OSError):
+            continue
+    return None
+
+
 def _get_counter(session_id: str) -> int:
     """Read the block counter for a session."""
-    counter_file = COUNTER_DIR / session_id
+    count = 0
+    if _gdbm is not None:
+        db = _gdbm_open("c")
+        if db is not None:
+            try:
+                with db:
+                    # value is b"<count> <unix-ts>"; the timestamp feeds
+                    # the TTL sweep since gdbm keys carry no mtime.
+                    count = int(db.get(session_id, b"0").split()[0])
+            except (_gdbm.error, OSError, ValueError, IndexError):
+                count = 0
+    # A per-session file may hold a write made while the shared db was
+    # locked; whichever store is further along is the real count.
     try:
-        return int(counter_file.read_text().strip())
-    except (FileNotFoundError, ValueError):
-        return 0
+        with open(COUNTER_DIR + "/" + session_id, "rb") as f:
+            count = max(count, int(f.read()))
+    except (OSError, ValueError):
+        pass
+    return count
 
 
 def _set_counter(session_id: str, count: int) -> None:
-    """Write the block counter for a session."""
-    COUNTER_DIR.mkdir(parents=True, exist_ok=True)
-    (COUNTER_DIR / session_id).write_text(str(count))
+    """Write the block counter for a session (atomic via rename)."""
+    if _gdbm is not None:
+        db = _gdbm_open("c")
+        if db is not None:
+            try:
+                with db:
+                    db[session_id] = ("%d %d" % (count, time.time())).encode()
+                return
+            except (_gdbm.error, OSError):
+                pass  # fall through to the per-session file
+    global _dir_ready
+    if not _dir_ready:
+        os.makedirs(COUNTER_DIR, exist_ok=True)
+        _dir_ready = True
+    tmp = COUNTER_DIR + "/." + session_id + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(str(count))
+    os.replace(tmp, COUNTER_DIR + "/" + session_id)
 
 
 def _clear_counter(session_id: str) -> None:
     """Clear the counter (session completed)."""
+    if _gdbm is not None:
+        db = _gdbm_open("c")
+        if db is not None:
+            try:
+                with db:
+                    if session_id in db:
+                        del db[session_id]
+            except (_gdbm.error, OSError):
+                pass
+    # Also drop any per-session file left by a locked-db fallback write.
     try:
-        (COUNTER_DIR / session_id).unlink()
-    except FileNotFoundError:
+        os.unlink(COUNTER_DIR + "/" + session_id)
+    except OSError:
+        pass
+
+
+def _maybe_sweep() -> None:
+    """Opportunistically purge counters from sessions dead for 72+ hours.
+
+    _clear_counter only fires on a clean done signal, so abandoned or
+    crashed sessions leak counters forever and the store grows without
+    bound. Sweeping on roughly one invocation in 128 keeps it small
+    without taxing the hot path; runs after the stop decision is already
+    on stdout, so the sweep's latency never delays the agent.
+    """
+    if random.random() >= 1 / 128:
+        return
+    cutoff = time.time() - _COUNTER_TTL
+    if _gdbm is not None:
+        try:
+            with _gdbm.open(COUNTER_DB, "w") as db:
+                for key in db.keys():
+                    val = db[key].split()
+                    if len(val) < 2 or int(val[1]) < cutoff:
+                        del db[key]
+        except (_gdbm.error, OSError, ValueError):
+            pass
+        return
+    try:
+        # scandir returns entries with the stat result already cached.
+        with os.scandir(COUNTER_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except OSError:
+                    continue
+    except OSError:
         pass
 
 
@@ -78,12 +209,10 @@ def _has_done_signal(text: str, session_id: str) -> bool:
     """Check if the done signal is present in the text."""
     if not text:
         return False
-    # Accept both AGENT_DONE::<session_id> and bare AGENT_DONE::
-    if f"{DONE_SIGNAL}{session_id}" in text:
-        return True
-    if DONE_SIGNAL in text:
-        return True
-    return False
+    # Both AGENT_DONE::<session_id> and bare AGENT_DONE:: are accepted,
+    # so one substring scan decides it — the final message can be tens
+    # of KB and the old double `in` check walked it twice.
+    return DONE_SIGNAL in text
 
 
 def _is_subagent(data: dict) -> bool:
@@ -91,62 +220,120 @@ def _is_subagent(data: dict) -> bool:
     transcript_path = data.get("transcript_path", "")
     if not transcript_path:
         return False
+    # Only the "fewer than 20 lines?" answer matters — stop reading as
+    # soon as the 20th newline shows up instead of scanning the whole
+    # transcript (which can be megabytes on long sessions). Raw
+    # os.read on the fd skips the text-decoder layer, and O_NOATIME
+    # (Linux; harmless 0 elsewhere) avoids an atime write per Stop.
     try:
-        line_count = sum(1 for _ in open(transcript_path))
-        return line_count < 20
-    except (FileNotFoundError, PermissionError):
+        fd = os.open(
+            transcript_path, os.O_RDONLY | getattr(os, "O_NOATIME", 0)
+        )
+    except PermissionError:
+        # O_NOATIME is only permitted for the file's owner
+        try:
+            fd = os.open(transcript_path, os.O_RDONLY)
+        except (FileNotFoundError, PermissionError):
+            return False
+    except FileNotFoundError:
         return False
-
-
-def _has_pending_tasks(session_id: str) -> tuple[bool, list[str]]:
-    """Query the daemon for pending tasks assigned to this session.
-
-    Returns (has_pending, task_titles).
+    try:
+        count = 0
+        last = b"\n"
+        while count < 20:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            count += chunk.count(b"\n")
+            last = chunk[-1:]
+        if last != b"\n":
+            count += 1  # unterminated final line still counts
+        return count < 20
+    finally:
+        os.close(fd)
+
+
+def _uds_get(port: int, path: str) -> bytes | None:
+    """Fetch a path over the daemon's unix socket. Returns the body or None.
+
+    The daemon serves plain HTTP on /tmp/agent-notify-daemon-<port>.sock;
+    a unix socket skips the TCP handshake and loopback stack, which is
+    worth it for a hook that runs synchronously on every Stop.
     """
-    port = int(os.environ.get("CODEX_NOTIFY_DAEMON_PORT", DEFAULT_PORT))
+    sock_path = f"/tmp/agent-notify-daemon-{port}.sock"
     try:
-        req = Request(f"http://127.0.0.1:{port}/api/tasks?session_id={session_id}&status=pending")
-        with urlopen(req, timeout=2) as resp:
-            tasks = json.loads(resp.read().decode())
-            if isinstance(tasks, list) and tasks:
-                titles = [t.get("title", "untitled") for t in tasks[:5]]
-                return True, titles
-    except (URLError, OSError, json.JSONDecodeError, ValueError):
-        pass
-    return False, []
-
-
-def _has_pending_global_tasks() -> tuple[bool, list[str]]:
-    """Check for any unassigned pending tasks globally."""
-    port = int(os.environ.get("CODEX_NOTIFY_DAEMON_PORT", DEFAULT_PORT))
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(2)
+            s.connect(sock_path)
+            # Connection: close makes the read-to-EOF below safe even if
+            # the server would otherwise hold the socket for keep-alive.
+            s.sendall(f"GET {path} HTTP/1.0\r\nConnection: close\r\n\r\n".encode())
+            chunks = []
+            while True:
+                chunk = s.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        head, _, body = b"".join(chunks).partition(b"\r\n\r\n")
+        if b" 200 " not in head.split(b"\r\n", 1)[0]:
+            return None
+        return body
+    except (OSError, AttributeError):
+        return None  # no socket support or daemon not listening there
+
+
+def _fetch_pending(session_id: str, include_global: bool = False) -> tuple[bool, list[str]]:
+    """Query the daemon once for pending tasks relevant to this session.
+
+    The guard_check endpoint folds the assigned-tasks and global-next-task
+    lookups into a single round trip — the guard runs synchronously on
+    every Stop, so one connect instead of two matters. Prefers the unix
+    socket, falling back to TCP. The unassigned-task sweep is only asked
+    for on re-prompts, where the guard genuinely escalates.
+    Returns (has_pending, task_titles).
+    """
+    port = _DAEMON_PORT
+    path = f"/api/tasks/guard_check?session_id={session_id}"
+    if include_global:
+        path += "&global=1"
     try:
-        req = Request(f"http://127.0.0.1:{port}/api/tasks/next")
-        with urlopen(req, timeout=2) as resp:
-            result = json.loads(resp.read().decode())
-            if isinstance(result, dict) and result.get("id"):
-                return True, [result.get("title", "untitled")]
-    except (URLError, OSError, json.JSONDecodeError, ValueError):
+        raw = _uds_get(port, path)
+        if raw is None:
+            # Bare http.client skips urllib's opener/handler machinery,
+            # which dominates the actual loopback round trip.
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            try:
+                conn.request("GET", path)
+                raw = conn.getresponse().read()
+            finally:
+                conn.close()
+        if not raw or raw == _EMPTY_PENDING:
+            return False, []
+        result = json.loads(raw)
+        if isinstance(result, dict):
+            titles = result.get("assigned") or result.get("global") or []
+            if titles:
+                return True, titles[:5]
+    except (OSError, http.client.HTTPException, json.JSONDecodeError, ValueError):
         pass
     return False, []
 
 
-def _compliance_prompt(session_id: str, attempt: int, pending_tasks: list[str] | None = None) -> str:
-    """Generate the compliance prompt that forces the agent to verify completion."""
-    task_section = ""
-    if pending_tasks:
-        task_list = "\n".join(f"   - {t}" for t in pending_tasks)
-        task_section = f"""
+# Prompt text precomputed at module level: only the attempt number, the
+# session id, and the optional task list vary per invocation, so each call
+# is a single .format instead of rebuilding the whole body.
+_TASK_SECTION_PENDING = """
 2. PENDING TASKS: The daemon reports these tasks are still pending:
 {task_list}
    Complete them now or mark them done if already finished.
 """
-    else:
-        task_section = """
+
+_TASK_SECTION_NONE = """
 2. TASK LIST: Check your task list (if any). Are ALL tasks marked completed?
    If not, complete them now.
 """
 
-    return f"""COMPLETION VERIFICATION REQUIRED (attempt {attempt})
+_PROMPT_TMPL = """COMPLETION VERIFICATION REQUIRED (attempt {attempt})
 
 Before you can stop, verify ALL of the following:
 
@@ -163,12 +350,51 @@ Before you can stop, verify ALL of the following:
    If not, do it now.
 
 If everything is truly complete, include this signal in your response:
-    {DONE_SIGNAL}{session_id}
+    {done_signal}{session_id}
 
 If anything is NOT complete, continue working. Progress is not completion.
 Do not stop until the user's goal is fully achieved."""
 
 
+def _compliance_prompt(session_id: str, attempt: int, pending_tasks: list[str] | None = None) -> str:
+    """Generate the compliance prompt that forces the agent to verify completion."""
+    if pending_tasks:
+        task_section = _TASK_SECTION_PENDING.format(
+            task_list="\n".join("   - " + t for t in pending_tasks)
+        )
+    else:
+        task_section = _TASK_SECTION_NONE
+    return _PROMPT_TMPL.format(
+        attempt=attempt,
+        task_section=task_section,
+        done_signal=DONE_SIGNAL,
+        session_id=session_id,
+    )
+
+
+def _emit_block(prompt: str) -> None:
+    """Write the block decision to stdout as pre-assembled wire bytes.
+
+    The envelope is fixed; only the reason varies, so JSON-encode just
+    that one string instead of a dict, and skip print's locking and
+    separator handling.
+    """
+    sys.stdout.buffer.write(
+        b'{"decision": "block", "reason": '
+        + json.dumps(prompt).encode()
+        + b"}\n"
+    )
+    sys.stdout.buffer.flush()
+
+
+def _block_and_exit(
+    session_id: str, attempt: int, pending_tasks: list[str] | None = None
+) -> None:
+    """Emit a block decision and exit — the one tail for every block branch."""
+    _emit_block(_compliance_prompt(session_id, attempt, pending_tasks))
+    sys.exit(0)
+
+
 def main() -> None:
     data = _read_stdin()
     session_id = data.get("session_id", "unknown")
@@ -176,6 +402,26 @@ def main() -> None:
     stop_hook_active = data.get("stop_hook_active", False)
     event_name = data.get("hook_event_name", "")
 
+    # Re-prompts almost always need the pending-task answer, so kick the
+    # daemon round trip off in the background and overlap it with the
+    # transcript scan, done-signal check, and counter read below.
+    fetch_slot: list = []
+    fetch_thread = None
+    if stop_hook_active:
+        fetch_thread = threading.Thread(
+            target=lambda: fetch_slot.append(
+                _fetch_pending(session_id, include_global=True)
+            ),
+            daemon=True,
+        )
+        fetch_thread.start()
+
+    def _pending() -> tuple[bool, list[str]]:
+        if fetch_thread is None:
+            return _fetch_pending(session_id)
+        fetch_thread.join(timeout=2.5)
+        return fetch_slot[0] if fetch_slot else (False, [])
+
     # Skip subagent sessions
     if _is_subagent(data):
         _log(f"[{session_id}] skipping subagent")
@@ -183,36 +429,30 @@ def main() -> None:
 
     # Check for done signal
     if _has_done_signal(last_message, session_id):
-        _clear_counter(session_id)
+        global _cleanup_session
+        _cleanup_session = session_id  # cleared after the allow goes out
         _log(f"[{session_id}] done signal found, allowing stop")
         sys.exit(0)
 
-    # Check for pending tasks (plan-aware guard)
-    has_tasks, task_titles = _has_pending_tasks(session_id)
-    if not has_tasks:
-        _, global_titles = _has_pending_global_tasks()
-        if global_titles:
-            has_tasks = True
-            task_titles = global_titles
-
     # Get counter
     count = _get_counter(session_id)
-    max_blocks = int(os.environ.get("AGENT_NOTIFY_GUARD_MAX", DEFAULT_MAX))
+    max_blocks = _MAX_BLOCKS
 
-    # First stop is allowed (warm-up) UNLESS there are pending tasks
-    if count == 0 and not stop_hook_active and not has_tasks:
+    # First stop is allowed (warm-up) — exit before paying the daemon
+    # round trip, which only matters for branches that might block.
+    if count == 0 and not stop_hook_active:
         _set_counter(session_id, 1)
         _log(f"[{session_id}] first stop, allowing (warm-up)")
         sys.exit(0)
 
+    # Check for pending tasks (plan-aware guard)
+    has_tasks, task_titles = _pending()
+
     # If pending tasks exist, always block (even on first stop)
     if has_tasks and count == 0:
         _set_counter(session_id, 1)
         _log(f"[{session_id}] blocking first stop — {len(task_titles)} pending tasks")
-        prompt = _compliance_prompt(session_id, 1, pending_tasks=task_titles)
-        result = {"decision": "block", "reason": prompt}
-        print(json.dumps(result))
-        sys.exit(0)
+        _block_and_exit(session_id, 1, pending_tasks=task_titles)
 
     # If already being re-prompted (stop_hook_active), this is a retry
     if stop_hook_active:
@@ -226,20 +466,16 @@ def main() -> None:
             sys.exit(0)
 
         _log(f"[{session_id}] blocking stop (attempt {count}/{max_blocks or 'unlimited'})")
-        prompt = _compliance_prompt(session_id, count, pending_tasks=task_titles if has_tasks else None)
-
-        result = {"decision": "block", "reason": prompt}
-        print(json.dumps(result))
-        sys.exit(0)
+        _block_and_exit(
+            session_id, count, pending_tasks=task_titles if has_tasks else None
+        )
 
     # Not yet active, first real block
     _set_counter(session_id, count + 1)
     _log(f"[{session_id}] blocking stop (attempt {count + 1})")
-    prompt = _compliance_prompt(session_id, count + 1, pending_tasks=task_titles if has_tasks else None)
-
-    result = {"decision": "block", "reason": prompt}
-    print(json.dumps(result))
-    sys.exit(0)
+    _block_and_exit(
+        session_id, count + 1, pending_tasks=task_titles if has_tasks else None
+    )
 
 
 def _log(msg: str) -> None:
@@ -247,4 +483,17 @@ def _log(msg: str) -> None:
 
 
 if __name__ == "__main__":
-    main()
+    # The decision is on stdout by the time main() exits; sweep stale
+    # counters afterwards and leave via os._exit so interpreter teardown
+    # (atexit, gc finalizers) never adds latency to the Stop hook.
+    code = 0
+    try:
+        main()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 0
+    sys.stdout.flush()
+    sys.stderr.flush()
+    if _cleanup_session is not None:
+        _clear_counter(_cleanup_session)
+    _maybe_sweep()
+    os._exit(code)
@@ -12,12 +12,43 @@ Wire format: newline-delimited JSON-RPC 2.0 over stdio.
 Zero dependencies — Python stdlib only.
 """
 
+import asyncio
+import gzip
+import http.client
 import json
 import os
+import socket
 import sys
-from pathlib import Path
-from urllib.request import urlopen, Request
-from urllib.error import URLError
+import threading
+import time
+from functools import lru_cache, partial
+from urllib.parse import urlencode
+
+try:
+    import orjson  # optional C accelerator, same trick as daemon.db
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def _dumps_pretty(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+else:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def _dumps_pretty(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+# Pre-bound hot lookup: one global load instead of module-attribute
+# chains on paths that run per message.
+_monotonic = time.monotonic
 
 SERVER_NAME = "agent-notify"
 SERVER_VERSION = "0.1.0"
@@ -26,44 +57,108 @@ PROTOCOL_VERSION = "2025-11-25"
 DEFAULT_PORT = 7878
 
 
-def _port() -> int:
-    return int(os.environ.get("CODEX_NOTIFY_DAEMON_PORT", DEFAULT_PORT))
-
-
-def _base_url() -> str:
-    return f"http://127.0.0.1:{_port()}"
+# Environment is fixed for the life of the process: parse the port and
+# derived strings once at import instead of per dispatch.
+_PORT = int(os.environ.get("CODEX_NOTIFY_DAEMON_PORT", DEFAULT_PORT))
+_BASE_URL = f"http://127.0.0.1:{_PORT}"
+_SOCK_PATH = os.environ.get(
+    "CODEX_NOTIFY_DAEMON_SOCK",
+    f"/tmp/agent-notify-daemon-{_PORT}.sock",
+)
+
+
+# One persistent connection per thread, reused across tool calls.
+# urllib built a fresh TCP connection (handshake, socket setup, opener
+# machinery) per call; on a loopback workload of small JSON messages
+# that setup cost dominates the actual round trip. http.client keeps
+# the socket open across requests when the daemon allows it, and
+# transparently reconnects when it doesn't. Thread-local storage keeps
+# concurrent executor-dispatched tool calls off each other's sockets.
+_conns = threading.local()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection speaking over a unix domain socket.
+
+    Same HTTP/1.1 framing, but the transport skips the TCP/IP stack —
+    roughly twice the small-message throughput of loopback TCP. The
+    daemon serves the identical API on its unix socket.
+    """
+
+    def __init__(self, path: str, timeout: float = 5):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+def _get_conn(force_tcp: bool = False) -> http.client.HTTPConnection:
+    conn = getattr(_conns, "conn", None)
+    if conn is None:
+        if not force_tcp and hasattr(socket, "AF_UNIX") and os.path.exists(_SOCK_PATH):
+            conn = _UnixHTTPConnection(_SOCK_PATH, timeout=5)
+        else:
+            conn = http.client.HTTPConnection("127.0.0.1", _PORT, timeout=5)
+        _conns.conn = conn
+    return conn
+
+
+def _raw_request(method: str, path: str, data: bytes | None = None) -> bytes:
+    """Issue one HTTP request over the shared connection, returning the body.
+
+    A stale keep-alive socket (daemon restarted, server timed us out)
+    surfaces as BadStatusLine/RemoteDisconnected on the first try, so
+    rebuild the connection once and retry before giving up.
+    """
+    # Offer gzip: large listings shrink a lot, and fewer bytes means
+    # less copying and a faster JSON parse. Daemons that don't compress
+    # simply answer identity-encoded.
+    headers = {"Connection": "keep-alive", "Accept-Encoding": "gzip"}
+    if data is not None:
+        headers["Content-Type"] = "application/json"
+    for attempt in (0, 1):
+        # If the unix socket fails (stale file, no listener), retry over
+        # TCP loopback rather than against the same dead path.
+        conn = _get_conn(force_tcp=bool(attempt))
+        try:
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+            if resp.getheader("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return body
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            _conns.conn = None
+            if attempt:
+                raise
 
 
 def _api_get(path: str) -> dict | list | None:
     try:
-        req = Request(f"{_base_url()}{path}")
-        with urlopen(req, timeout=3) as resp:
-            return json.loads(resp.read().decode())
-    except (URLError, OSError, json.JSONDecodeError, ValueError):
+        return _loads(_raw_request("GET", path))
+    except (http.client.HTTPException, OSError, json.JSONDecodeError, ValueError):
         return None
 
 
-def _api_post(path: str, body: dict | None = None) -> dict | list | None:
+def _api_send(method: str, path: str, body: dict | None = None) -> dict | list | None:
+    """Shared body-carrying request path — POST and PUT differ only in verb."""
     try:
-        data = json.dumps(body or {}).encode()
-        req = Request(
-            f"{_base_url()}{path}",
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        with urlopen(req, timeout=5) as resp:
-            return json.loads(resp.read().decode())
-    except (URLError, OSError, json.JSONDecodeError, ValueError) as e:
+        return _loads(_raw_request(method, path, _dumps(body or {})))
+    except (http.client.HTTPException, OSError, json.JSONDecodeError, ValueError) as e:
         return {"error": str(e)}
 
 
+_api_post = partial(_api_send, "POST")
+
+
 def _api_delete(path: str) -> dict | None:
     try:
-        req = Request(f"{_base_url()}{path}", method="DELETE")
-        with urlopen(req, timeout=3) as resp:
-            return json.loads(resp.read().decode())
-    except (URLError, OSError, json.JSONDecodeError, ValueError):
+        return _loads(_raw_request("DELETE", path))
+    except (http.client.HTTPException, OSError, json.JSONDecodeError, ValueError):
         return None
 
 
@@ -648,256 +743,375 @@ TOOLS = [
             "additionalProperties": False,
         },
     },
+    {
+        "name": "notify_batch",
+        "description": (
+            "Run several read-only notify tools in one daemon round trip. "
+            "Accepts a list of {name, args} sub-calls (GET-style tools only — "
+            "listings, lookups, health) and returns their results in order. "
+            "Use this instead of calling notify_list_agents, notify_get_agent, "
+            "notify_agent_events back to back."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "calls": {
+                    "type": "array",
+                    "description": "Sub-calls to execute, in order (max 50)",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {
+                                "type": "string",
+                                "description": "Tool name (read-only tools only)",
+                            },
+                            "args": {
+                                "type": "object",
+                                "description": "Arguments for the tool",
+                            },
+                        },
+                        "required": ["name"],
+                    },
+                },
+            },
+            "required": ["calls"],
+            "additionalProperties": False,
+        },
+        "annotations": {"readOnlyHint": True},
+    },
 ]
 
 
-# ---------------------------------------------------------------------------
-# Tool handlers
-# ---------------------------------------------------------------------------
-
-def _handle_tool(name: str, args: dict) -> dict:
-    """Dispatch a tool call. Returns {"content": [...], "isError": bool}."""
-    try:
-        result = _dispatch(name, args)
-        text = json.dumps(result, indent=2) if isinstance(result, (dict, list)) else str(result)
-        return {"content": [{"type": "text", "text": text}], "isError": False}
-    except Exception as e:
-        return {"content": [{"type": "text", "text": f"Error: {e}"}], "isError": True}
-
-
-def _dispatch(name: str, args: dict):
-    if name == "notify_list_agents":
-        params = []
-        if args.get("status"):
-            params.append(f"status={args['status']}")
-        query = "?" + "&".join(params) if params else ""
-        result = _api_get(f"/api/agents{query}")
-        if result is None:
-            raise ConnectionError("daemon not running or not responding")
-        return result
+# Every enum list from the tool schemas, frozen once at import and
+# keyed by (tool, field) — O(1) membership checks, shared by the
+# validators and anyone else needing the legal values.
+_ENUMS: dict[tuple[str, str], frozenset] = {
+    (tool["name"], field): frozenset(prop["enum"])
+    for tool in TOOLS
+    for field, prop in tool.get("inputSchema", {}).get("properties", {}).items()
+    if "enum" in prop
+}
+
+
+def _build_validators() -> dict:
+    """Compile each tool's inputSchema into a tiny validator closure.
+
+    Only the cheap, decisive checks — required keys and enum membership.
+    Rejecting a malformed call locally costs two set lookups instead of
+    a daemon round trip that would come back as an error anyway.
+    """
+    validators = {}
+    for tool in TOOLS:
+        schema = tool.get("inputSchema", {})
+        required = tuple(schema.get("required", ()))
+        enums = {
+            field: members
+            for (name, field), members in _ENUMS.items()
+            if name == tool["name"]
+        }
+        if not required and not enums:
+            continue
 
-    if name == "notify_get_agent":
-        result = _api_get(f"/api/agents/{args['session_id']}")
-        if result is None:
-            raise ConnectionError("daemon not running or not responding")
-        return result
+        def _validate(args: dict, _required=required, _enums=enums) -> None:
+            for r in _required:
+                if r not in args:
+                    raise ValueError(f"missing required argument: {r}")
+            for k, allowed in _enums.items():
+                v = args.get(k)
+                if v is not None and v not in allowed:
+                    raise ValueError(f"invalid value for {k}: {v!r}")
 
-    if name == "notify_agent_events":
-        limit = args.get("limit", 20)
-        result = _api_get(f"/api/agents/{args['session_id']}/events?limit={limit}")
-        if result is None:
-            raise ConnectionError("daemon not running or not responding")
-        return result
+        validators[tool["name"]] = _validate
+    return validators
 
-    if name == "notify_spawn_agent":
-        body = {"agent": args.get("agent", "claude")}
-        if args.get("prompt"):
-            body["prompt"] = args["prompt"]
-        if args.get("cwd"):
-            body["cwd"] = args["cwd"]
-        result = _api_post("/api/agents/spawn", body)
-        if result and result.get("error"):
-            raise RuntimeError(result["error"])
-        return result
 
-    if name == "notify_stop_agent":
-        result = _api_post(f"/api/agents/{args['session_id']}/stop")
-        if result and result.get("error"):
-            raise RuntimeError(result["error"])
-        return result
+_VALIDATORS = _build_validators()
 
-    if name == "notify_send_message":
-        body = {
-            "from_session": args["from_session"],
-            "to_session": args["to_session"],
-            "content": args["content"],
-            "message_type": args.get("message_type", "handoff"),
-        }
-        result = _api_post("/api/messages", body)
-        if result and result.get("error"):
-            raise RuntimeError(result["error"])
-        return result
 
-    if name == "notify_send_text":
-        result = _api_post(
-            f"/api/agents/{args['session_id']}/send",
-            {"text": args["text"]},
-        )
-        if result and result.get("error"):
-            raise RuntimeError(result["error"])
-        return result
+def _q(args: dict, keys: tuple = (), defaults: dict | None = None) -> str:
+    """Build a URL-escaped query string from the selected args.
 
-    if name == "notify_approve_agent":
-        result = _api_post(f"/api/agents/{args['session_id']}/approve")
-        if result and result.get("error"):
-            raise RuntimeError(result["error"])
-        return result
+    Replaces the hand-rolled list/join blocks scattered through
+    _dispatch, which skipped URL escaping — a session_id or project
+    containing '&', '=' or spaces used to corrupt the request.
+    """
+    params = {k: args[k] for k in keys if args.get(k)}
+    if defaults:
+        params.update(defaults)
+    return "?" + urlencode(params) if params else ""
 
-    if name == "notify_reject_agent":
-        result = _api_post(f"/api/agents/{args['session_id']}/reject")
-        if result and result.get("error"):
-            raise RuntimeError(result["error"])
-        return result
 
-    if name == "notify_list_events":
-        params = []
-        if args.get("agent"):
-            params.append(f"agent={args['agent']}")
-        if args.get("category"):
-            params.append(f"category={args['category']}")
-        if args.get("project"):
-            params.append(f"project={args['project']}")
-        limit = args.get("limit", 30)
-        params.append(f"limit={limit}")
-        query = "?" + "&".join(params)
-        result = _api_get(f"/api/events{query}")
-        if result is None:
-            raise ConnectionError("daemon not running or not responding")
-        return result
+# ---------------------------------------------------------------------------
+# Tool handlers
+# ---------------------------------------------------------------------------
 
-    if name == "notify_health":
-        result = _api_get("/api/health")
-        if result is None:
-            raise ConnectionError("daemon not running or not responding")
-        return result
+# Short-TTL cache for the read-only tools agents poll in tight loops —
+# a hit skips the whole daemon round trip. Any write tool clears the
+# cache, so reads never serve state from before the caller's own write.
+_CACHE: dict[tuple, tuple[float, dict]] = {}
+_CACHE_MAX = 256
+_TTLS = {
+    "notify_health": 2.0,
+    "notify_list_rules": 2.0,
+    "notify_list_agents": 0.5,
+    "notify_get_agent": 0.5,
+    "notify_agent_events": 0.5,
+    "notify_list_events": 0.5,
+    "notify_list_messages": 0.5,
+    "notify_list_tasks": 0.5,
+    "notify_next_task": 0.5,
+    "notify_list_context": 0.5,
+    "notify_get_context": 0.5,
+    # Read-only, so it must not clear the cache; its list-valued args are
+    # unhashable, which makes it skip cache storage naturally.
+    "notify_batch": 0.5,
+}
+
+
+def _ok(text: str) -> dict:
+    return {"content": [{"type": "text", "text": text}], "isError": False}
+
+
+def _err(text: str) -> dict:
+    return {"content": [{"type": "text", "text": "Error: " + text}], "isError": True}
+
+
+_DAEMON_DOWN = _err("daemon not running or not responding")
+
+
+def _render(result) -> str:
+    if not isinstance(result, (dict, list)):
+        return str(result)
+    # Flat status dicts ({"id": 1, "status": "created"} and friends) gain
+    # nothing from pretty-printing; compact output is faster to encode
+    # and fewer bytes on the wire. Anything nested keeps indent=2 for
+    # the agent's benefit.
+    if isinstance(result, dict) and not any(
+        isinstance(v, (dict, list)) for v in result.values()
+    ):
+        return _dumps(result).decode()
+    return _dumps_pretty(result)
 
-    if name == "notify_list_messages":
-        params = []
-        if args.get("status"):
-            params.append(f"status={args['status']}")
-        limit = args.get("limit", 30)
-        params.append(f"limit={limit}")
-        query = "?" + "&".join(params)
-        result = _api_get(f"/api/messages{query}")
-        if result is None:
-            raise ConnectionError("daemon not running or not responding")
-        return result
 
-    if name == "notify_list_tasks":
-        params = []
-        if args.get("session_id"):
-            params.append(f"session_id={args['session_id']}")
-        if args.get("status"):
-            params.append(f"status={args['status']}")
-        query = "?" + "&".join(params) if params else ""
-        result = _api_get(f"/api/tasks{query}")
+def _handle_tool(name: str, args: dict) -> dict:
+    """Dispatch a tool call. Returns {"content": [...], "isError": bool}."""
+    ttl = _TTLS.get(name)
+    key = None
+    if ttl is not None:
+        try:
+            key = (name, tuple(sorted(args.items())))
+            hit = _CACHE.get(key)
+        except TypeError:  # unhashable arg value — just skip the cache
+            key = hit = None
+        if hit is not None and _monotonic() - hit[0] < ttl:
+            return hit[1]
+    else:
+        # Write tool: daemon state is about to change, drop stale reads.
+        _CACHE.clear()
+    try:
+        validate = _VALIDATORS.get(name)
+        if validate is not None:
+            validate(args)
+        envelope = _ok(_render(_dispatch(name, args)))
+    except ConnectionError:
+        # By far the most common failure (daemon not up) — reuse one
+        # prebuilt envelope instead of re-rendering it per call.
+        return _DAEMON_DOWN
+    except (RuntimeError, KeyError, ValueError, TypeError) as e:
+        return _err(str(e))
+    if key is not None:
+        if len(_CACHE) >= _CACHE_MAX:
+            _CACHE.pop(next(iter(_CACHE)))  # FIFO eviction
+        _CACHE[key] = (_monotonic(), envelope)
+    return envelope
+
+
+# Tool routing table: one hash lookup instead of a linear if/elif chain,
+# and one generic executor instead of ~25 hand-rolled copies of the
+# build-body / call / check-error pattern. Each entry is
+#   (method, path template, body keys, body defaults, query keys, query defaults)
+# Query defaults are looked up in args first, so e.g. limit honors the
+# caller's value and falls back to the documented default.
+_ROUTES: dict[str, tuple] = {
+    "notify_list_agents": ("GET", "/api/agents", (), {}, ("status",), {}),
+    "notify_get_agent": ("GET", "/api/agents/{session_id}", (), {}, (), {}),
+    "notify_agent_events": (
+        "GET", "/api/agents/{session_id}/events", (), {}, (), {"limit": 20}),
+    "notify_spawn_agent": (
+        "POST", "/api/agents/spawn",
+        ("agent", "prompt", "cwd"), {"agent": "claude"}, (), {}),
+    "notify_stop_agent": ("POST", "/api/agents/{session_id}/stop", (), {}, (), {}),
+    "notify_send_message": (
+        "POST", "/api/messages",
+        ("from_session", "to_session", "content", "message_type"),
+        {"message_type": "handoff"}, (), {}),
+    "notify_send_text": (
+        "POST", "/api/agents/{session_id}/send", ("text",), {}, (), {}),
+    "notify_approve_agent": (
+        "POST", "/api/agents/{session_id}/approve", (), {}, (), {}),
+    "notify_reject_agent": (
+        "POST", "/api/agents/{session_id}/reject", (), {}, (), {}),
+    "notify_list_events": (
+        "GET", "/api/events", (), {},
+        ("agent", "category", "project"), {"limit": 30}),
+    "notify_health": ("GET", "/api/health", (), {}, (), {}),
+    "notify_list_messages": (
+        "GET", "/api/messages", (), {}, ("status",), {"limit": 30}),
+    "notify_list_tasks": (
+        "GET", "/api/tasks", (), {}, ("session_id", "status"), {}),
+    "notify_create_task": (
+        "POST", "/api/tasks",
+        ("title", "description", "session_id", "priority", "dependencies"),
+        {}, (), {}),
+    "notify_next_task": ("GET", "/api/tasks/next", (), {}, ("session_id",), {}),
+    "notify_update_task": (
+        "PUT", "/api/tasks/{task_id}",
+        ("status", "title", "description", "priority", "session_id",
+         "dependencies"),
+        {}, (), {}),
+    "notify_set_context": (
+        "POST", "/api/context",
+        ("key", "value", "scope", "updated_by"), {}, (), {}),
+    "notify_list_context": ("GET", "/api/context", (), {}, ("scope",), {}),
+    "notify_delete_context": (
+        "DELETE", "/api/context/{key}", (), {}, (), {"scope": "global"}),
+    "notify_add_route": (
+        "POST", "/api/rules",
+        ("from_agent", "event_type", "action", "priority", "template"),
+        {"from_agent": "*", "to_agent": "*", "event_type": "completion",
+         "priority": 0, "template": ""},
+        (), {}),
+    "notify_list_rules": ("GET", "/api/rules", (), {}, (), {}),
+    "notify_delete_rule": ("DELETE", "/api/rules/{rule_id}", (), {}, (), {}),
+    "notify_set_preference": ("POST", "/api/preferences", ("key", "value"), {}, (), {}),
+}
+
+
+# List tools whose result is emitted verbatim over stdio: the daemon's
+# JSON bytes pass straight through as the response text, skipping the
+# json.loads + re-dumps round trip on what can be multi-KB payloads.
+_PASSTHROUGH = frozenset({
+    "notify_list_agents",
+    "notify_agent_events",
+    "notify_list_events",
+    "notify_list_messages",
+    "notify_list_tasks",
+    "notify_list_context",
+    "notify_list_rules",
+})
+
+
+def _build_path(spec: tuple, args: dict) -> str:
+    """Format a route's path template and query string for one call."""
+    path_tmpl, query_keys, query_defaults = spec[1], spec[4], spec[5]
+    path = path_tmpl.format(**args) if "{" in path_tmpl else path_tmpl
+    qdefaults = (
+        {k: args.get(k, v) for k, v in query_defaults.items()}
+        if query_defaults else None
+    )
+    return path + _q(args, query_keys, qdefaults)
+
+
+@lru_cache(maxsize=1024)
+def _cached_path(name: str, args_items: tuple) -> str:
+    return _build_path(_ROUTES[name], dict(args_items))
+
+
+def _exec(name: str, spec: tuple, args: dict, raw: bool = False):
+    """Run one table-driven tool call against the daemon."""
+    method, _, body_keys, body_defaults, _, _ = spec
+    # Agents poll with identical args, so the str.format + urlencode
+    # work is memoized per (tool, args). Unhashable args fall back to
+    # computing inline.
+    try:
+        path = _cached_path(name, tuple(sorted(args.items())))
+    except TypeError:
+        path = _build_path(spec, args)
+
+    if method == "GET" or method == "DELETE":
+        if raw and method == "GET":
+            try:
+                body = _raw_request("GET", path)
+            except (http.client.HTTPException, OSError):
+                body = None
+            if not body:
+                raise ConnectionError("daemon not running or not responding")
+            return body.decode()  # _render passes strings through untouched
+        result = _api_get(path) if method == "GET" else _api_delete(path)
         if result is None:
             raise ConnectionError("daemon not running or not responding")
         return result
 
-    if name == "notify_create_task":
-        body = {"title": args["title"]}
-        for field in ("description", "session_id", "priority", "dependencies"):
-            if args.get(field):
-                body[field] = args[field]
-        result = _api_post("/api/tasks", body)
-        if result and result.get("error"):
-            raise RuntimeError(result["error"])
-        return result
-
-    if name == "notify_update_task":
-        task_id = args.pop("task_id")
-        # Use PUT via urllib
+    body = {k: args[k] for k in body_keys if args.get(k) is not None}
+    for k, v in body_defaults.items():
+        body.setdefault(k, v)
+    result = _api_send(method, path, body)
+    if result and isinstance(result, dict) and result.get("error"):
+        raise RuntimeError(result["error"])
+    return result
+
+
+# Handlers that don't fit the table shape live here.
+
+def _tool_get_context(args: dict):
+    scope = args.get("scope", "global")
+    key = args["key"]
+    # GET /api/context?key=K&scope=X — the daemon answers with the one
+    # row (primary-key lookup) instead of the whole scope.
+    item = _api_get("/api/context" + _q({}, defaults={"key": key, "scope": scope}))
+    if item is None:
+        raise ConnectionError("daemon not running or not responding")
+    if isinstance(item, dict) and "error" not in item:
+        return item
+    return {"key": key, "scope": scope, "value": None, "message": "not found"}
+
+
+def _tool_batch(args: dict):
+    """Fan several read-only sub-calls into one POST /api/batch round trip."""
+    calls = args.get("calls", [])
+    if not isinstance(calls, list):
+        raise ValueError("calls must be a list")
+    results: list = [None] * len(calls)
+    requests = []
+    slots = []  # result index for each packed sub-request
+    for i, call in enumerate(calls):
+        name = call.get("name", "") if isinstance(call, dict) else ""
+        sub_args = call.get("args") or {} if isinstance(call, dict) else {}
+        spec = _ROUTES.get(name)
+        if spec is None or spec[0] != "GET":
+            results[i] = {"error": f"not batchable: {name or 'missing name'}"}
+            continue
         try:
-            data = json.dumps(args).encode()
-            req = Request(
-                f"{_base_url()}/api/tasks/{task_id}",
-                data=data,
-                headers={"Content-Type": "application/json"},
-                method="PUT",
+            path = _build_path(spec, sub_args)
+        except KeyError as e:
+            results[i] = {"error": f"missing argument: {e}"}
+            continue
+        requests.append({"method": "GET", "path": path})
+        slots.append(i)
+    if requests:
+        resp = _api_post("/api/batch", {"requests": requests})
+        if not isinstance(resp, dict) or resp.get("error"):
+            raise RuntimeError(
+                resp.get("error") if isinstance(resp, dict) else "bad batch response"
             )
-            with urlopen(req, timeout=5) as resp:
-                result = json.loads(resp.read().decode())
-        except (URLError, OSError, json.JSONDecodeError, ValueError) as e:
-            raise RuntimeError(str(e))
-        return result
+        for i, sub in zip(slots, resp.get("responses", [])):
+            results[i] = sub.get("body") if isinstance(sub, dict) else sub
+    return results
 
-    if name == "notify_next_task":
-        params = []
-        if args.get("session_id"):
-            params.append(f"session_id={args['session_id']}")
-        query = "?" + "&".join(params) if params else ""
-        result = _api_get(f"/api/tasks/next{query}")
-        if result is None:
-            raise ConnectionError("daemon not running or not responding")
-        return result
-
-    if name == "notify_set_context":
-        body = {"key": args["key"], "value": args["value"]}
-        if args.get("scope"):
-            body["scope"] = args["scope"]
-        if args.get("updated_by"):
-            body["updated_by"] = args["updated_by"]
-        result = _api_post("/api/context", body)
-        if result and result.get("error"):
-            raise RuntimeError(result["error"])
-        return result
 
-    if name == "notify_get_context":
-        scope = args.get("scope", "global")
-        # GET /api/context?scope=X — then filter by key client-side
-        # (simpler than adding a key query param to the API)
-        all_ctx = _api_get(f"/api/context?scope={scope}")
-        if all_ctx is None:
-            raise ConnectionError("daemon not running or not responding")
-        key = args["key"]
-        for item in all_ctx if isinstance(all_ctx, list) else []:
-            if item.get("key") == key:
-                return item
-        return {"key": key, "scope": scope, "value": None, "message": "not found"}
-
-    if name == "notify_list_context":
-        params = []
-        if args.get("scope"):
-            params.append(f"scope={args['scope']}")
-        query = "?" + "&".join(params) if params else ""
-        result = _api_get(f"/api/context{query}")
-        if result is None:
-            raise ConnectionError("daemon not running or not responding")
-        return result
+_CUSTOM = {
+    "notify_get_context": _tool_get_context,
+    "notify_batch": _tool_batch,
+}
 
-    if name == "notify_delete_context":
-        scope = args.get("scope", "global")
-        result = _api_delete(f"/api/context/{args['key']}?scope={scope}")
-        if result is None:
-            raise ConnectionError("daemon not running or not responding")
-        return result
-
-    if name == "notify_add_route":
-        body = {
-            "from_agent": args.get("from_agent", "*"),
-            "to_agent": "*",
-            "event_type": args.get("event_type", "completion"),
-            "action": args["action"],
-            "priority": args.get("priority", 0),
-            "template": args.get("template", ""),
-        }
-        result = _api_post("/api/rules", body)
-        if result and result.get("error"):
-            raise RuntimeError(result["error"])
-        return result
-
-    if name == "notify_list_rules":
-        result = _api_get("/api/rules")
-        if result is None:
-            raise ConnectionError("daemon not running or not responding")
-        return result
-
-    if name == "notify_delete_rule":
-        result = _api_delete(f"/api/rules/{args['rule_id']}")
-        if result is None:
-            raise ConnectionError("daemon not running or not responding")
-        return result
-
-    if name == "notify_set_preference":
-        result = _api_post("/api/preferences", {
-            "key": args["key"],
-            "value": args["value"],
-        })
-        if result and result.get("error"):
-            raise RuntimeError(result["error"])
-        return result
 
+def _dispatch(name: str, args: dict):
+    spec = _ROUTES.get(name)
+    if spec is not None:
+        return _exec(name, spec, args, raw=name in _PASSTHROUGH)
+    handler = _CUSTOM.get(name)
+    if handler is not None:
+        return handler(args)
     raise ValueError(f"unknown tool: {name}")
 
 
@@ -905,6 +1119,23 @@ def _dispatch(name: str, args: dict):
 # JSON-RPC message handling
 # ---------------------------------------------------------------------------
 
+# The tool schema never changes at runtime, so serialize it exactly once
+# at import instead of re-walking the big TOOLS literal on every
+# tools/list. Only the request id varies, and it gets spliced into the
+# fixed envelope below.
+_TOOLS_JSON = json.dumps({"tools": TOOLS}, separators=(",", ":")).encode()
+
+
+def _tools_list_response(req_id) -> bytes:
+    return (
+        b'{"jsonrpc":"2.0","id":'
+        + _dumps(req_id)
+        + b',"result":'
+        + _TOOLS_JSON
+        + b"}"
+    )
+
+
 def _response(req_id, result: dict) -> dict:
     return {"jsonrpc": "2.0", "id": req_id, "result": result}
 
@@ -913,84 +1144,203 @@ def _error(req_id, code: int, message: str) -> dict:
     return {"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message}}
 
 
-def _handle_message(msg: dict) -> dict | None:
-    """Handle a JSON-RPC message. Returns a response dict, or None for notifications."""
-    method = msg.get("method", "")
-    req_id = msg.get("id")
-    params = msg.get("params", {})
+_KNOWN_TOOLS = frozenset(t["name"] for t in TOOLS)
 
-    # Notifications (no id) — handle silently
-    if req_id is None:
-        return None
 
-    if method == "initialize":
-        return _response(req_id, {
-            "protocolVersion": PROTOCOL_VERSION,
-            "capabilities": {
-                "tools": {"listChanged": False},
-            },
-            "serverInfo": {
-                "name": SERVER_NAME,
-                "version": SERVER_VERSION,
-            },
-            "instructions": (
-                "agent-notify is a control plane for coordinating multiple AI coding agents. "
-                "Use these tools to see what other agents are doing, spawn new agents, "
-                "send messages between agents, and manage agent sessions."
-            ),
-        })
+def _handle_initialize(req_id, params):
+    return _response(req_id, {
+        "protocolVersion": PROTOCOL_VERSION,
+        "capabilities": {
+            "tools": {"listChanged": False},
+        },
+        "serverInfo": {
+            "name": SERVER_NAME,
+            "version": SERVER_VERSION,
+        },
+        "instructions": (
+            "agent-notify is a control plane for coordinating multiple AI coding agents. "
+            "Use these tools to see what other agents are doing, spawn new agents, "
+            "send messages between agents, and manage agent sessions."
+        ),
+    })
+
+
+def _handle_ping(req_id, params):
+    return _response(req_id, {})
 
-    if method == "ping":
-        return _response(req_id, {})
 
-    if method == "tools/list":
-        return _response(req_id, {"tools": TOOLS})
+def _handle_tools_list(req_id, params):
+    return _tools_list_response(req_id)
 
-    if method == "tools/call":
-        tool_name = params.get("name", "")
-        arguments = params.get("arguments", {})
 
-        # Check tool exists
-        known = {t["name"] for t in TOOLS}
-        if tool_name not in known:
-            return _error(req_id, -32602, f"Unknown tool: {tool_name}")
+def _handle_tools_call(req_id, params):
+    tool_name = params.get("name", "")
+    if tool_name not in _KNOWN_TOOLS:
+        return _error(req_id, -32602, f"Unknown tool: {tool_name}")
+    result = _handle_tool(tool_name, params.get("arguments", {}))
+    return _response(req_id, result)
 
-        result = _handle_tool(tool_name, arguments)
-        return _response(req_id, result)
 
-    return _error(req_id, -32601, f"Method not found: {method}")
+_METHODS = {
+    "initialize": _handle_initialize,
+    "ping": _handle_ping,
+    "tools/list": _handle_tools_list,
+    "tools/call": _handle_tools_call,
+}
+
+
+def _handle_message(msg: dict) -> dict | bytes | None:
+    """Handle a JSON-RPC message.
+
+    Returns a response dict, pre-serialized bytes for constant responses,
+    or None for notifications.
+    """
+    req_id = msg.get("id")
+
+    # Notifications (no id) — handle silently
+    if req_id is None:
+        return None
+
+    method = msg.get("method", "")
+    handler = _METHODS.get(method)
+    if handler is None:
+        return _error(req_id, -32601, f"Method not found: {method}")
+    return handler(req_id, msg.get("params", {}))
 
 
 # ---------------------------------------------------------------------------
 # Main stdio loop
 # ---------------------------------------------------------------------------
 
-def main() -> None:
-    """Run the MCP stdio server."""
-    _log("agent-notify MCP server starting")
-    _log(f"daemon endpoint: {_base_url()}")
+_PARSE_ERROR = {
+    "jsonrpc": "2.0", "id": None,
+    "error": {"code": -32700, "message": "Parse error"},
+}
+
+# How many requests may run concurrently against the daemon.
+_POOL_SIZE = 8
+
+
+async def _amain() -> None:
+    """Async stdio loop: requests dispatch concurrently.
+
+    Tool calls spend their time waiting on the daemon, so each incoming
+    request runs in the default executor while the loop keeps reading
+    stdin — several in-flight JSON-RPC requests overlap instead of
+    serializing end to end. Responses may therefore arrive out of
+    order, which JSON-RPC explicitly permits (clients match on id).
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer
+    )
+    write_lock = asyncio.Lock()
+    # Cap in-flight requests: a host that floods a huge burst gets the
+    # pool's worth of overlap without queueing a thread per message.
+    slots = asyncio.Semaphore(_POOL_SIZE)
+    pending: set[asyncio.Task] = set()
+
+    async def _serve(msg: dict) -> None:
+        try:
+            async with slots:
+                resp = await loop.run_in_executor(None, _handle_message, msg)
+        except Exception as e:  # truly unexpected: answer rather than drop
+            resp = _error(msg.get("id"), -32603, f"Internal error: {e}")
+        if resp is not None:
+            async with write_lock:
+                _write(resp)
 
-    for line in sys.stdin:
+    async def _feed(line: bytes) -> None:
         line = line.strip()
         if not line:
+            return
+        try:
+            msg = _loads(line)
+        except (json.JSONDecodeError, ValueError):
+            async with write_lock:
+                _write(_PARSE_ERROR)
+            return
+        task = asyncio.create_task(_serve(msg))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    # Read in big chunks and let bytes.split carve the lines in one C
+    # pass, instead of a readline() buffer scan per message. The tail
+    # after the last newline carries over to the next chunk.
+    buf = b""
+    while True:
+        chunk = await reader.read(65536)
+        if not chunk:
+            break
+        buf += chunk
+        if b"\n" not in chunk:
             continue
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            await _feed(line)
+    if buf.strip():
+        await _feed(buf)  # unterminated final line still counts
+
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _main_sync() -> None:
+    """Plain blocking loop, kept for platforms where stdin can't be polled."""
 
+    def _serve(line: bytes) -> None:
+        line = line.strip()
+        if not line:
+            return
         try:
-            msg = json.loads(line)
-        except json.JSONDecodeError:
-            resp = {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
+            msg = _loads(line)
+        except (json.JSONDecodeError, ValueError):
+            _write(_PARSE_ERROR)
+            return
+        try:
+            resp = _handle_message(msg)
+        except Exception as e:  # truly unexpected: answer rather than drop
+            resp = _error(msg.get("id"), -32603, f"Internal error: {e}")
+        if resp is not None:
             _write(resp)
+
+    buf = b""
+    while True:
+        chunk = os.read(0, 65536)
+        if not chunk:
+            break
+        buf += chunk
+        if b"\n" not in chunk:
             continue
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            _serve(line)
+    if buf.strip():
+        _serve(buf)
 
-        resp = _handle_message(msg)
-        if resp is not None:
-            _write(resp)
+
+def main() -> None:
+    """Run the MCP stdio server."""
+    _log("agent-notify MCP server starting")
+    _log(f"daemon endpoint: {_BASE_URL}")
+
+    try:
+        asyncio.run(_amain())
+    except (NotImplementedError, ValueError, OSError):
+        # connect_read_pipe can refuse non-pollable stdin (regular files,
+        # some platforms); the sync loop handles everything, just serially.
+        _main_sync()
 
 
-def _write(msg: dict) -> None:
+def _write(msg: dict | bytes) -> None:
     """Write a JSON-RPC message to stdout."""
-    sys.stdout.write(json.dumps(msg, separators=(",", ":")) + "\n")
-    sys.stdout.flush()
+    if not isinstance(msg, bytes):
+        msg = _dumps(msg)
+    # One unbuffered write of the whole frame: a single syscall per
+    # response, and os.write of the full payload is atomic enough for
+    # newline framing (both loops already serialize writers).
+    os.write(1, msg + b"\n")
 
 
 def _log(msg: str) -> None:
@@ -5,22 +5,22 @@ Messages are delivered by typing into the target agent's terminal pane.
 Each agent stays in its own authenticated CLI session — the mesh just routes text.
 """
 
-import json
-from datetime import datetime, timezone
-
-from .db import Database
+from .db import Database, _iso_now
 from .terminal import send_text
 
 
-async def route_message(db: Database, message_id: int) -> dict:
+async def route_message(db: Database, message_id: int, msg: dict | None = None) -> dict:
     """Route a message to its target agent's terminal.
 
     Checks coordination rules, delivers if auto-approved, otherwise
-    leaves as pending for manual approval.
+    leaves as pending for manual approval. Callers that already hold the
+    message row (e.g. fresh from insert_message) pass it as msg to skip
+    the lookup.
 
     Returns {"action": "delivered|pending|blocked", ...}
     """
-    msg = db.get_message(message_id)
+    if msg is None:
+        msg = db.get_message(message_id)
     if not msg:
         return {"action": "error", "error": "message not found"}
 
@@ -43,21 +43,31 @@ async def route_message(db: Database, message_id: int) -> dict:
         return {"action": "blocked", "reason": "coordination rule"}
 
     if action == "auto":
-        # Auto-deliver: type message into target terminal
-        result = await deliver_message(db, msg, to_session)
+        # Auto-deliver: type message into target terminal. The source
+        # session is already in hand — don't refetch it inside.
+        result = await deliver_message(db, msg, to_session, from_session)
         return result
 
     # Default: pending (requires manual approval)
     return {"action": "pending", "message_id": message_id}
 
 
-async def deliver_message(db: Database, msg: dict, to_session: dict) -> dict:
-    """Deliver a message by typing it into the target agent's terminal."""
-    terminal = to_session.get("terminal", "{}")
+async def deliver_message(
+    db: Database, msg: dict, to_session: dict, from_session: dict | None = None
+) -> dict:
+    """Deliver a message by typing it into the target agent's terminal.
+
+    Callers that already hold the source session row pass it as
+    from_session to save the second lookup.
+    """
+    # get_session attaches the pre-parsed descriptor; fall back to the
+    # raw JSON string for callers passing a bare row.
+    terminal = to_session.get("_terminal_obj") or to_session.get("terminal", "{}")
 
     # Format the message as agent input
     content = msg.get("content", "")
-    from_session = db.get_session(msg["from_session"])
+    if from_session is None:
+        from_session = db.get_session(msg["from_session"])
     from_name = from_session["agent_name"] if from_session else "unknown"
 
     # Prefix with context so the receiving agent knows the source
@@ -65,9 +75,8 @@ async def deliver_message(db: Database, msg: dict, to_session: dict) -> dict:
 
     result = await send_text(terminal, text)
 
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%fZ")
     if result.get("ok"):
-        db.update_message_status(msg["id"], "delivered", delivered_at=now)
+        db.update_message_status(msg["id"], "delivered", delivered_at=_iso_now())
         return {"action": "delivered", "message_id": msg["id"]}
     else:
         return {
@@ -89,7 +98,9 @@ async def approve_message(db: Database, message_id: int) -> dict:
     if not to_session:
         return {"ok": False, "error": "target session not found"}
 
-    return await deliver_message(db, msg, to_session)
+    return await deliver_message(
+        db, msg, to_session, db.get_session(msg["from_session"])
+    )
 
 
 async def reject_message(db: Database, message_id: int) -> dict:
@@ -1,9 +1,16 @@
 """Dataclasses for daemon events, agent sessions, and mesh messages."""
 
-from dataclasses import dataclass, field, asdict
+import json
+from dataclasses import dataclass, field
 
+try:
+    import orjson  # optional C accelerator, same trick as daemon.db
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
-@dataclass
+
+@dataclass(slots=True)
 class Terminal:
     bundle_id: str = ""
     multiplexer: str = ""
@@ -16,17 +23,29 @@ class Terminal:
     zellij_session: str = ""
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Explicit literal: asdict() does a recursive deepcopy-style walk
+        # that costs ~an order of magnitude more than building the dict.
+        return {
+            "bundle_id": self.bundle_id,
+            "multiplexer": self.multiplexer,
+            "tmux_socket": self.tmux_socket,
+            "tmux_pane": self.tmux_pane,
+            "kitty_window_id": self.kitty_window_id,
+            "kitty_socket": self.kitty_socket,
+            "wezterm_pane": self.wezterm_pane,
+            "wezterm_socket": self.wezterm_socket,
+            "zellij_session": self.zellij_session,
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> "Terminal":
         if not data or not isinstance(data, dict):
             return cls()
-        known = {f.name for f in cls.__dataclass_fields__.values()}
+        known = cls._FIELDS
         return cls(**{k: str(v) for k, v in data.items() if k in known})
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     agent_name: str = ""
     session_id: str = ""
@@ -38,9 +57,16 @@ class Event:
     terminal: Terminal = field(default_factory=Terminal)
 
     def to_dict(self) -> dict:
-        d = asdict(self)
-        d["terminal"] = self.terminal.to_dict()
-        return d
+        return {
+            "agent_name": self.agent_name,
+            "session_id": self.session_id,
+            "category": self.category,
+            "title": self.title,
+            "message": self.message,
+            "project_cwd": self.project_cwd,
+            "git_branch": self.git_branch,
+            "terminal": self.terminal.to_dict(),
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> "Event":
@@ -48,18 +74,19 @@ class Event:
             return cls()
         terminal_data = data.get("terminal", {})
         if isinstance(terminal_data, str):
-            import json
+            # orjson's JSONDecodeError subclasses ValueError, so one
+            # except clause covers both decoders.
             try:
-                terminal_data = json.loads(terminal_data)
-            except (json.JSONDecodeError, TypeError):
+                terminal_data = _loads(terminal_data)
+            except (ValueError, TypeError):
                 terminal_data = {}
-        known = {f.name for f in cls.__dataclass_fields__.values()} - {"terminal"}
+        known = cls._FIELDS
         kwargs = {k: v for k, v in data.items() if k in known}
         kwargs["terminal"] = Terminal.from_dict(terminal_data)
         return cls(**kwargs)
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """Agent-to-agent mesh message."""
     from_session: str = ""
@@ -69,17 +96,23 @@ class Message:
     status: str = "pending"  # pending, approved, delivered, rejected
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "from_session": self.from_session,
+            "to_session": self.to_session,
+            "message_type": self.message_type,
+            "content": self.content,
+            "status": self.status,
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> "Message":
         if not data or not isinstance(data, dict):
             return cls()
-        known = {f.name for f in cls.__dataclass_fields__.values()}
+        known = cls._FIELDS
         return cls(**{k: v for k, v in data.items() if k in known})
 
 
-@dataclass
+@dataclass(slots=True)
 class CoordinationRule:
     """Rule governing agent-to-agent message delivery."""
     from_agent: str = "*"   # agent name or * for any
@@ -88,11 +121,25 @@ class CoordinationRule:
     action: str = "approve"  # auto, approve, block
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "from_agent": self.from_agent,
+            "to_agent": self.to_agent,
+            "event_type": self.event_type,
+            "action": self.action,
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> "CoordinationRule":
         if not data or not isinstance(data, dict):
             return cls()
-        known = {f.name for f in cls.__dataclass_fields__.values()}
+        known = cls._FIELDS
         return cls(**{k: v for k, v in data.items() if k in known})
+
+
+# Accepted from_dict keys, computed once per class instead of a set
+# comprehension over __dataclass_fields__ on every deserialize. Event
+# excludes terminal, which from_dict parses separately.
+Terminal._FIELDS = frozenset(Terminal.__dataclass_fields__)
+Event._FIELDS = frozenset(Event.__dataclass_fields__) - {"terminal"}
+Message._FIELDS = frozenset(Message.__dataclass_fields__)
+CoordinationRule._FIELDS = frozenset(CoordinationRule.__dataclass_fields__)
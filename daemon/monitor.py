@@ -13,6 +13,7 @@ Hysteresis: a single new event resets the counter to 0, preventing flapping.
 """
 
 import asyncio
+import sys
 
 from .db import Database
 from .sse import SSERegistry
@@ -48,61 +49,80 @@ class Monitor:
             self._task = None
 
     async def _loop(self) -> None:
+        # The monitor should never crash the daemon, but a hung DB used
+        # to be re-probed (and identical alerts re-fired) every tick
+        # forever — back off exponentially on repeated failure instead.
+        # With no SSE listeners and no prior escalation state, an alert
+        # would reach nobody and there is nothing to de-escalate, so the
+        # scan is skipped entirely.
+        backoff = CHECK_INTERVAL
         while True:
-            await asyncio.sleep(CHECK_INTERVAL)
+            await asyncio.sleep(backoff)
             try:
+                if self.sse.client_count == 0 and not self._levels:
+                    continue
                 await self._check()
-            except Exception:
-                pass  # monitor should never crash the daemon
+                backoff = CHECK_INTERVAL
+            except Exception as e:
+                print(f"agent-notify monitor: check failed: {e}", file=sys.stderr)
+                backoff = min(backoff * 2, 300)
 
     async def _check(self) -> None:
         """Check all active sessions and escalate/de-escalate as needed."""
-        # Check stale at each threshold level
-        for level, threshold, alert_type, severity in [
-            (1, STALE_THRESHOLD, "stale_agent", "warning"),
-            (2, STUCK_THRESHOLD, "stuck_agent", "alert"),
-            (3, DEAD_THRESHOLD, "dead_agent", "critical"),
-        ]:
-            stale = self.db.stale_sessions(threshold)
-            for session in stale:
-                sid = session["session_id"]
-                current_level = self._levels.get(sid, 0)
-
-                # Only escalate, never repeat the same level
-                if current_level >= level:
-                    continue
-
-                self._levels[sid] = level
-                await self.sse.broadcast({
-                    "type": "alert",
-                    "alert_type": alert_type,
-                    "severity": severity,
-                    "level": level,
-                    "session_id": sid,
-                    "agent_name": session.get("agent_name", ""),
-                    "project_cwd": session.get("project_cwd", ""),
-                    "status": session.get("status", ""),
-                    "last_seen": session.get("last_seen", ""),
-                    "message": _alert_message(session, level),
-                })
+        # One query returns every live session with its idle seconds,
+        # idlest first — instead of a stale_sessions probe per threshold.
+        # Rows are sorted by idle descending, so the first one below the
+        # stale threshold ends the scan (NULL idle sorts last).
+        for session in self.db.sessions_with_idle_seconds():
+            idle = session["idle"]
+            if idle is None or idle < STALE_THRESHOLD:
+                break
+            if idle >= DEAD_THRESHOLD:
+                level, alert_type, severity = 3, "dead_agent", "critical"
+            elif idle >= STUCK_THRESHOLD:
+                level, alert_type, severity = 2, "stuck_agent", "alert"
+            else:
+                level, alert_type, severity = 1, "stale_agent", "warning"
+
+            sid = session["session_id"]
+            # Only escalate, never repeat the same level
+            if self._levels.get(sid, 0) >= level:
+                continue
+
+            self._levels[sid] = level
+            await self.sse.broadcast({
+                "type": "alert",
+                "alert_type": alert_type,
+                "severity": severity,
+                "level": level,
+                "session_id": sid,
+                "agent_name": session.get("agent_name", ""),
+                "project_cwd": session.get("project_cwd", ""),
+                "status": session.get("status", ""),
+                "last_seen": session.get("last_seen", ""),
+                "message": _alert_message(session, level),
+            })
 
     def clear_alert(self, session_id: str) -> None:
         """Reset escalation level when agent produces new activity (hysteresis)."""
-        if session_id in self._levels:
-            del self._levels[session_id]
+        self._levels.pop(session_id, None)
 
     def get_level(self, session_id: str) -> int:
         """Get current escalation level for a session."""
         return self._levels.get(session_id, 0)
 
 
+# Indexed by escalation level; out-of-range levels fall back to slot 0.
+_ALERT_TEMPLATES = (
+    "{agent} in {project} status unknown",
+    "{agent} in {project} may be stalling (no recent output)",
+    "{agent} in {project} appears stuck (no output for 5+ min)",
+    "{agent} in {project} appears dead (no output for 15+ min)",
+)
+
+
 def _alert_message(session: dict, level: int) -> str:
-    agent = session.get("agent_name", "Agent")
-    project = session.get("project_cwd", "?")
-    if level == 1:
-        return f"{agent} in {project} may be stalling (no recent output)"
-    if level == 2:
-        return f"{agent} in {project} appears stuck (no output for 5+ min)"
-    if level == 3:
-        return f"{agent} in {project} appears dead (no output for 15+ min)"
-    return f"{agent} in {project} status unknown"
+    return _ALERT_TEMPLATES[level if 0 <= level <= 3 else 0].format(
+        agent=session.get("agent_name", "Agent"),
+        project=session.get("project_cwd", "?"),
+    )
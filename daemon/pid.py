@@ -1,6 +1,7 @@
 """PID file management for the daemon process."""
 
 import os
+import select
 import signal
 import time
 from pathlib import Path
@@ -57,21 +58,42 @@ def stop_daemon() -> bool:
     except PermissionError:
         return False
 
+    # Grab a pidfd before signalling (Linux 5.3+ / Python 3.9+): select
+    # on it blocks until the exact moment of exit, instead of rounding
+    # shutdown latency up to a polling interval.
+    try:
+        pidfd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        pidfd = None
+
     # Send SIGTERM
     try:
         os.kill(pid, signal.SIGTERM)
     except ProcessLookupError:
+        if pidfd is not None:
+            os.close(pidfd)
         remove_pid()
         return True
 
-    # Poll for up to 2 seconds
-    for _ in range(20):
-        time.sleep(0.1)
+    # Wait for up to 2 seconds
+    if pidfd is not None:
         try:
-            os.kill(pid, 0)
-        except ProcessLookupError:
+            ready, _, _ = select.select([pidfd], [], [], 2.0)
+        finally:
+            os.close(pidfd)
+        if ready:
             remove_pid()
             return True
+    else:
+        # No pidfd on this platform: poll, at 10 ms so a fast shutdown
+        # isn't rounded up to 100 ms.
+        for _ in range(200):
+            time.sleep(0.01)
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                remove_pid()
+                return True
 
     # SIGKILL fallback
     try:
@@ -23,6 +23,7 @@ and action is one of the above. The `priority` field controls precedence when
 multiple rules match.
 """
 
+import asyncio
 import json
 
 from .db import Database
@@ -51,16 +52,38 @@ async def route_after_work(db: Database, event_data: dict) -> list[dict]:
     if not route_rules:
         return []
 
-    results = []
-    for rule in route_rules:
-        result = await _execute_route(db, rule, event_data, session_id)
-        results.append(result)
+    # Independent actions (notify + next_task + ...) run concurrently —
+    # wall time becomes the slowest action, not the sum. Pipelines are
+    # ordered sequences by definition, so they run afterwards, serially.
+    # Handoff messages accumulate in pending_messages and land in one
+    # batched insert below instead of a transaction per rule.
+    independent = [r for r in route_rules if r.get("action") != "pipeline"]
+    pipelines = [r for r in route_rules if r.get("action") == "pipeline"]
+
+    results: list[dict] = []
+    pending_messages: list[dict] = []
+    if independent:
+        results.extend(await asyncio.gather(*(
+            _execute_route(db, rule, event_data, session_id, pending_messages)
+            for rule in independent
+        )))
+    for rule in pipelines:
+        results.append(
+            await _execute_route(db, rule, event_data, session_id, pending_messages)
+        )
+
+    if pending_messages:
+        db.insert_messages(pending_messages)
 
     return results
 
 
 async def _execute_route(
-    db: Database, rule: dict, event_data: dict, session_id: str
+    db: Database,
+    rule: dict,
+    event_data: dict,
+    session_id: str,
+    pending_messages: list[dict] | None = None,
 ) -> dict:
     """Execute a single routing action."""
     action = rule.get("action", "")
@@ -70,7 +93,9 @@ async def _execute_route(
         return await _route_next_task(db, session_id)
 
     if action == "handoff":
-        return await _route_handoff(db, event_data, template, session_id)
+        return await _route_handoff(
+            db, event_data, template, session_id, pending_messages
+        )
 
     if action == "spawn":
         return await _route_spawn(db, event_data, template)
@@ -79,7 +104,9 @@ async def _execute_route(
         return _route_notify(event_data, template)
 
     if action == "pipeline":
-        return await _route_pipeline(db, event_data, template, session_id)
+        return await _route_pipeline(
+            db, event_data, template, session_id, pending_messages
+        )
 
     return {"action": action, "status": "unknown_action"}
 
@@ -104,7 +131,7 @@ async def _route_next_task(db: Database, session_id: str) -> dict:
         if task.get("description"):
             text += f"\n{task['description']}"
         text += "\n"
-        await send_text(session.get("terminal", "{}"), text)
+        await send_text(session.get("_terminal_obj") or session.get("terminal", "{}"), text)
 
     return {
         "action": "next_task",
@@ -115,7 +142,11 @@ async def _route_next_task(db: Database, session_id: str) -> dict:
 
 
 async def _route_handoff(
-    db: Database, event_data: dict, template: str, from_session_id: str
+    db: Database,
+    event_data: dict,
+    template: str,
+    from_session_id: str,
+    pending_messages: list[dict] | None = None,
 ) -> dict:
     """Hand off work to another agent session."""
     target_session_id = template.strip()
@@ -133,16 +164,21 @@ async def _route_handoff(
     content = summary or message or "Work completed"
 
     text = f"[Handoff from {agent_name}] {content}\n"
-    result = await send_text(target.get("terminal", "{}"), text)
+    result = await send_text(target.get("_terminal_obj") or target.get("terminal", "{}"), text)
 
-    # Also store as a message in the mesh
-    db.insert_message({
+    # Also store as a message in the mesh — batched by the caller when
+    # several handoffs fire for one completion.
+    record = {
         "from_session": from_session_id,
         "to_session": target_session_id,
         "message_type": "handoff",
         "content": content,
         "status": "delivered" if result.get("ok") else "pending",
-    })
+    }
+    if pending_messages is not None:
+        pending_messages.append(record)
+    else:
+        db.insert_message(record)
 
     return {
         "action": "handoff",
@@ -188,7 +224,11 @@ def _route_notify(event_data: dict, template: str) -> dict:
 
 
 async def _route_pipeline(
-    db: Database, event_data: dict, template: str, session_id: str
+    db: Database,
+    event_data: dict,
+    template: str,
+    session_id: str,
+    pending_messages: list[dict] | None = None,
 ) -> dict:
     """Execute a sequence of routing actions."""
     try:
@@ -204,7 +244,9 @@ async def _route_pipeline(
         if not isinstance(step, dict):
             continue
         step_rule = {"action": step.get("action", ""), "template": step.get("template", "")}
-        result = await _execute_route(db, step_rule, event_data, session_id)
+        result = await _execute_route(
+            db, step_rule, event_data, session_id, pending_messages
+        )
         results.append(result)
 
     return {"action": "pipeline", "status": "ok", "steps": results}
@@ -9,6 +9,7 @@ Phase 4: Monitoring (stuck detection, session events)
 import time
 import uuid
 from typing import Any
+from urllib.parse import parse_qs
 
 from .db import Database
 from .mesh import route_message, approve_message, reject_message
@@ -19,6 +20,41 @@ from .terminal import send_text, send_approve, send_reject, send_interrupt, spaw
 
 VERSION = "0.1.0"
 
+# Shared error responses: returned directly, never mutated, so the hot
+# error branches (404 storms included) allocate nothing.
+_RESP_404_NOT_FOUND = {"status": 404, "body": {"error": "not found"}}
+_RESP_404_SESSION = {"status": 404, "body": {"error": "session not found"}}
+_RESP_404_TASK = {"status": 404, "body": {"error": "task not found"}}
+_RESP_404_MESSAGE = {"status": 404, "body": {"error": "message not found"}}
+_RESP_404_RULE = {"status": 404, "body": {"error": "rule not found"}}
+_RESP_404_CONTEXT = {"status": 404, "body": {"error": "context variable not found"}}
+_RESP_404_PREFERENCE = {"status": 404, "body": {"error": "preference not found"}}
+_RESP_400_TITLE = {"status": 400, "body": {"error": "title required"}}
+_RESP_400_TEXT = {"status": 400, "body": {"error": "text required"}}
+_RESP_400_KEY = {"status": 400, "body": {"error": "key required"}}
+
+# Catch-all browser response: the dashboard hits / aggressively on load.
+_RESP_INDEX = {"status": 200, "body": "", "serve_static": "index.html"}
+
+
+def _needs_session(fn):
+    """Resolve the session (through the cache) before the handler runs.
+
+    Replaces the get-or-404 preamble the _agent_* handlers all shared;
+    the decorated handler receives the session row as its second
+    argument and is only called when it exists.
+    """
+    async def wrapper(self, session_id, *args):
+        session = self.db.get_session_cached(session_id)
+        if not session:
+            return _RESP_404_SESSION
+        result = fn(self, session_id, session, *args)
+        if hasattr(result, "__await__"):
+            result = await result
+        return result
+
+    return wrapper
+
 
 class Router:
     def __init__(
@@ -32,6 +68,70 @@ class Router:
         self.sse = sse
         self.monitor = monitor
         self.start_time = start_time
+        # /api/health is polled by every dashboard: reuse the response
+        # for half a second so N pollers cost at most 2 DB hits/s.
+        self._health_cache: tuple[float, dict] | None = None
+
+        # Dispatch tables, built once here instead of a ~30-branch
+        # if/elif walk per request. Fixed routes are one dict hit on
+        # (method, path); parametric families
+        # (/api/<family>/{id}[/<action>]) go through _param_routes keyed
+        # by (method, family, action). Entries normalize every handler
+        # to (query, body) / (ident, query, body) so dispatch stays
+        # generic across the mixed signatures.
+        self._static_routes = {
+            ("POST", "/api/events"): lambda q, b: self._post_event(b),
+            # POST /api/batch — multiplex several GETs in one round trip
+            ("POST", "/api/batch"): lambda q, b: self._batch(b),
+            ("GET", "/api/events/stream"): lambda q, b: None,  # SSE ownership
+            ("GET", "/api/events"): lambda q, b: self._list_events(q),
+            ("GET", "/api/agents"): lambda q, b: self._list_agents(q),
+            ("GET", "/api/health"): lambda q, b: self._health(),
+            ("POST", "/api/heartbeat"): lambda q, b: self._heartbeat(b),
+            ("GET", "/api/preferences"): lambda q, b: self._list_preferences(),
+            ("POST", "/api/preferences"): lambda q, b: self._set_preference(b),
+            ("POST", "/api/agents/spawn"): lambda q, b: self._agent_spawn(b),
+            ("POST", "/api/messages"): lambda q, b: self._post_message(b),
+            ("GET", "/api/messages"): lambda q, b: self._list_messages(q),
+            ("POST", "/api/tasks"): lambda q, b: self._post_task(b),
+            ("GET", "/api/tasks/next"): lambda q, b: self._next_task(q),
+            # GET /api/tasks/guard_check — one round trip for the Stop hook
+            ("GET", "/api/tasks/guard_check"): lambda q, b: self._guard_check(q),
+            ("GET", "/api/tasks"): lambda q, b: self._list_tasks(q),
+            ("GET", "/api/context"): lambda q, b: self._list_context(q),
+            ("POST", "/api/context"): lambda q, b: self._set_context(b),
+            ("POST", "/api/rules"): lambda q, b: self._post_rule(b),
+            ("GET", "/api/rules"): lambda q, b: self._list_rules(),
+        }
+        for ui_path in ("/", "/ui", "/dashboard"):
+            self._static_routes[("GET", ui_path)] = lambda q, b: _RESP_INDEX
+
+        self._param_routes = {
+            ("POST", "agents", "stop"): lambda i, q, b: self._agent_stop(i),
+            ("POST", "agents", "approve"): lambda i, q, b: self._agent_approve(i),
+            ("POST", "agents", "reject"): lambda i, q, b: self._agent_reject(i),
+            ("POST", "agents", "send"): lambda i, q, b: self._agent_send(i, b),
+            ("POST", "agents", "interrupt"): lambda i, q, b: self._agent_interrupt(i),
+            ("GET", "agents", "events"): lambda i, q, b: self._agent_events(i, q),
+            ("GET", "agents", "children"): lambda i, q, b: self._agent_children(i),
+            ("GET", "agents", ""): lambda i, q, b: self._get_agent(i),
+            ("POST", "messages", "approve"): lambda i, q, b: self._approve_message(i),
+            ("POST", "messages", "reject"): lambda i, q, b: self._reject_message(i),
+            ("GET", "messages", ""): lambda i, q, b: self._get_message(i),
+            ("PUT", "tasks", ""): lambda i, q, b: self._update_task(i, b),
+            ("DELETE", "tasks", ""): lambda i, q, b: self._delete_task(i),
+            ("GET", "tasks", ""): lambda i, q, b: self._get_task(i),
+            ("DELETE", "context", ""): (
+                lambda i, q, b: self._delete_context(i, q.get("scope", "global"))
+            ),
+            ("DELETE", "rules", ""): lambda i, q, b: self._delete_rule(i),
+            ("DELETE", "preferences", ""): lambda i, q, b: self._delete_preference(i),
+        }
+        # Families whose ident is a numeric row id: dispatch coerces once
+        # so the handlers take ints and skip the try/except prologue.
+        self._int_idents = frozenset(
+            key for key in self._param_routes if key[1] in ("messages", "tasks", "rules")
+        )
 
     async def dispatch(self, request: dict) -> dict | None:
         """Dispatch request to handler. Returns None for SSE (writer ownership)."""
@@ -40,192 +140,104 @@ class Router:
         query = request.get("query", {})
         body = request.get("body", {})
 
-        # --- Phase 1: Core ---
-
-        if method == "POST" and path == "/api/events":
-            return await self._post_event(body)
-
-        if method == "GET" and path == "/api/events/stream":
-            return None  # Signal SSE ownership
-
-        if method == "GET" and path == "/api/events":
-            return self._list_events(query)
-
-        if method == "GET" and path == "/api/agents":
-            return self._list_agents(query)
-
-        if method == "GET" and path == "/api/health":
-            return self._health()
-
-        # POST /api/heartbeat
-        if method == "POST" and path == "/api/heartbeat":
-            return self._heartbeat(body)
-
-        # --- Preferences ---
-
-        if method == "GET" and path == "/api/preferences":
-            return self._list_preferences()
-
-        if method == "POST" and path == "/api/preferences":
-            return self._set_preference(body)
-
-        if method == "DELETE" and path.startswith("/api/preferences/"):
-            key = path[len("/api/preferences/"):]
-            return self._delete_preference(key)
-
-        # --- Phase 2: Two-way control ---
-
-        # POST /api/agents/spawn
-        if method == "POST" and path == "/api/agents/spawn":
-            return await self._agent_spawn(body)
-
-        # POST /api/agents/{id}/stop
-        if method == "POST" and path.startswith("/api/agents/") and path.endswith("/stop"):
-            session_id = path[len("/api/agents/"):-len("/stop")]
-            return await self._agent_stop(session_id)
-
-        # POST /api/agents/{id}/approve
-        if method == "POST" and path.startswith("/api/agents/") and path.endswith("/approve"):
-            session_id = path[len("/api/agents/"):-len("/approve")]
-            return await self._agent_approve(session_id)
-
-        # POST /api/agents/{id}/reject
-        if method == "POST" and path.startswith("/api/agents/") and path.endswith("/reject"):
-            session_id = path[len("/api/agents/"):-len("/reject")]
-            return await self._agent_reject(session_id)
-
-        # POST /api/agents/{id}/send
-        if method == "POST" and path.startswith("/api/agents/") and path.endswith("/send"):
-            session_id = path[len("/api/agents/"):-len("/send")]
-            return await self._agent_send(session_id, body)
-
-        # POST /api/agents/{id}/interrupt
-        if method == "POST" and path.startswith("/api/agents/") and path.endswith("/interrupt"):
-            session_id = path[len("/api/agents/"):-len("/interrupt")]
-            return await self._agent_interrupt(session_id)
-
-        # GET /api/agents/{id}/events
-        if method == "GET" and path.startswith("/api/agents/") and path.endswith("/events"):
-            session_id = path[len("/api/agents/"):-len("/events")]
-            return self._agent_events(session_id, query)
-
-        # GET /api/agents/{id}/children
-        if method == "GET" and path.startswith("/api/agents/") and path.endswith("/children"):
-            session_id = path[len("/api/agents/"):-len("/children")]
-            return self._agent_children(session_id)
-
-        # GET /api/agents/{id}  (must come after more specific routes)
-        if method == "GET" and path.startswith("/api/agents/"):
-            session_id = path[len("/api/agents/"):]
-            return self._get_agent(session_id)
-
-        # --- Phase 3: Agent mesh ---
-
-        if method == "POST" and path == "/api/messages":
-            return await self._post_message(body)
-
-        if method == "GET" and path == "/api/messages":
-            return self._list_messages(query)
-
-        # POST /api/messages/{id}/approve
-        if method == "POST" and path.startswith("/api/messages/") and path.endswith("/approve"):
-            msg_id = path[len("/api/messages/"):-len("/approve")]
-            return await self._approve_message(msg_id)
-
-        # POST /api/messages/{id}/reject
-        if method == "POST" and path.startswith("/api/messages/") and path.endswith("/reject"):
-            msg_id = path[len("/api/messages/"):-len("/reject")]
-            return await self._reject_message(msg_id)
-
-        # GET /api/messages/{id}
-        if method == "GET" and path.startswith("/api/messages/"):
-            msg_id = path[len("/api/messages/"):]
-            return self._get_message(msg_id)
-
-        # --- Tasks ---
-
-        if method == "POST" and path == "/api/tasks":
-            return self._post_task(body)
-
-        if method == "GET" and path == "/api/tasks/next":
-            return self._next_task(query)
-
-        if method == "GET" and path == "/api/tasks":
-            return self._list_tasks(query)
-
-        # PUT /api/tasks/{id}
-        if method == "PUT" and path.startswith("/api/tasks/"):
-            task_id = path[len("/api/tasks/"):]
-            return self._update_task(task_id, body)
-
-        # DELETE /api/tasks/{id}
-        if method == "DELETE" and path.startswith("/api/tasks/"):
-            task_id = path[len("/api/tasks/"):]
-            return self._delete_task(task_id)
-
-        # GET /api/tasks/{id}
-        if method == "GET" and path.startswith("/api/tasks/"):
-            task_id = path[len("/api/tasks/"):]
-            return self._get_task(task_id)
-
-        # --- Context (shared variables) ---
-
-        if method == "GET" and path == "/api/context":
-            return self._list_context(query)
-
-        if method == "POST" and path == "/api/context":
-            return self._set_context(body)
-
-        if method == "DELETE" and path.startswith("/api/context/"):
-            key = path[len("/api/context/"):]
-            scope = query.get("scope", "global")
-            return self._delete_context(key, scope)
-
-        # --- Coordination rules ---
-
-        if method == "POST" and path == "/api/rules":
-            return self._post_rule(body)
-
-        if method == "GET" and path == "/api/rules":
-            return self._list_rules()
-
-        if method == "DELETE" and path.startswith("/api/rules/"):
-            rule_id = path[len("/api/rules/"):]
-            return self._delete_rule(rule_id)
-
-        # --- Web UI ---
-        if method == "GET" and path in ("/", "/ui", "/dashboard"):
-            return {"status": 200, "body": "", "serve_static": "index.html"}
-
-        return _response(404, {"error": "not found"})
+        handler = self._static_routes.get((method, path))
+        if handler is not None:
+            result = handler(query, body)
+        else:
+            result = None
+            if path.startswith("/api/"):
+                family, sep, rest = path[5:].partition("/")
+                if sep and rest:
+                    ident, slash, action = rest.rpartition("/")
+                    if not slash:
+                        ident, action = action, ""
+                    key = (method, family, action)
+                    handler = self._param_routes.get(key)
+                    if handler is None and action:
+                        # Last segment isn't an action for this family —
+                        # the whole remainder is the id (ids and context
+                        # keys are opaque strings).
+                        key = (method, family, "")
+                        handler = self._param_routes.get(key)
+                        ident = rest
+                    if handler is not None:
+                        if key in self._int_idents:
+                            try:
+                                ident = int(ident)
+                            except ValueError:
+                                return _response(
+                                    400, {"error": f"invalid {family[:-1]} id"}
+                                )
+                        result = handler(ident, query, body)
+            if handler is None:
+                return _RESP_404_NOT_FOUND
+
+        if hasattr(result, "__await__"):
+            result = await result
+        return result
 
     # --- Phase 1 handlers ---
 
+    async def _batch(self, body: dict) -> dict:
+        """Execute up to 50 GET sub-requests through the router in one call.
+
+        Lets clients (CLI scripting loops, MCP server) amortize the HTTP
+        round trip when listing several resources at once.
+        """
+        requests = body.get("requests", [])
+        if not isinstance(requests, list):
+            return _response(400, {"error": "requests must be a list"})
+
+        responses = []
+        for sub in requests[:50]:
+            if not isinstance(sub, dict):
+                responses.append({"status": 400, "body": {"error": "invalid request"}})
+                continue
+            if sub.get("method", "GET").upper() != "GET":
+                responses.append({"status": 405, "body": {"error": "only GET allowed in batch"}})
+                continue
+            raw_path = sub.get("path", "")
+            query = dict(sub.get("query", {})) if isinstance(sub.get("query"), dict) else {}
+            if "?" in raw_path:
+                raw_path, _, raw_query = raw_path.partition("?")
+                for k, v in parse_qs(raw_query).items():
+                    query[k] = v[0] if len(v) == 1 else v
+            result = await self.dispatch({
+                "method": "GET",
+                "path": raw_path.rstrip("/") or "/",
+                "query": query,
+                "body": {},
+            })
+            if result is None or result.get("serve_static"):
+                responses.append({"status": 400, "body": {"error": "not batchable"}})
+            else:
+                responses.append({
+                    "status": result.get("status", 200),
+                    "body": result.get("body", {}),
+                })
+        return _response(200, {"responses": responses})
+
     async def _post_event(self, body: dict) -> dict:
         if not body.get("title") and not body.get("agent_name"):
             return _response(400, {"error": "title or agent_name required"})
 
-        event_id = self.db.insert_event(body)
-        self.db.upsert_session(body)
+        event_data = self.db.record_event(body)
+        event_id = event_data["id"]
 
         # Clear stuck alert on new activity
         session_id = body.get("session_id", "")
         if session_id:
             self.monitor.clear_alert(session_id)
 
-        event_data = self.db.get_event(event_id)
-        if event_data:
-            await self.sse.broadcast(event_data)
+        await self.sse.broadcast(event_data)
 
         # After-work routing: trigger on completion/stop events
         route_results = await route_after_work(self.db, body)
         if route_results:
-            for rr in route_results:
-                await self.sse.broadcast({
-                    "type": "route",
-                    "session_id": body.get("session_id", ""),
-                    **rr,
-                })
+            await self.sse.broadcast_many([
+                {"type": "route", "session_id": session_id, **rr}
+                for rr in route_results
+            ])
 
         return _response(201, {"id": event_id, "status": "created"})
 
@@ -247,21 +259,27 @@ class Router:
     def _get_agent(self, session_id: str) -> dict:
         session = self.db.get_session(session_id)
         if not session:
-            return _response(404, {"error": "session not found"})
+            return _RESP_404_SESSION
+        session.pop("_terminal_obj", None)  # internal parse cache, not API surface
         return _response(200, session)
 
     def _health(self) -> dict:
-        uptime = time.time() - self.start_time
-        sessions = self.db.list_sessions()
-        active = sum(1 for s in sessions if s["status"] in ("active", "waiting"))
-        return _response(200, {
+        now = time.time()
+        cached = self._health_cache
+        if cached is not None and now - cached[0] < 0.5:
+            return cached[1]
+        uptime = now - self.start_time
+        total, active = self.db.session_counts()
+        resp = _response(200, {
             "status": "ok",
             "version": VERSION,
             "uptime": round(uptime, 1),
             "sse_clients": self.sse.client_count,
-            "agents_total": len(sessions),
+            "agents_total": total,
             "agents_active": active,
         })
+        self._health_cache = (now, resp)
+        return resp
 
     # --- Phase 2 handlers ---
 
@@ -279,21 +297,21 @@ class Router:
 
         # Register a synthetic start event so the daemon tracks this session
         session_id = f"spawn-{uuid.uuid4().hex[:12]}"
+        agent_name = agent.capitalize()
         event_data = {
-            "agent_name": agent.capitalize(),
+            "agent_name": agent_name,
             "session_id": session_id,
             "category": "start",
-            "title": f"{agent.capitalize()}: Spawned from daemon",
+            "title": f"{agent_name}: Spawned from daemon",
             "message": prompt or "New session",
             "project_cwd": cwd,
             "terminal": terminal,
         }
-        self.db.insert_event(event_data)
-        self.db.upsert_session(event_data)
+        self.db.record_event(event_data)
 
         await self.sse.broadcast({
             "type": "spawn", "action": "spawned",
-            "session_id": session_id, "agent_name": agent.capitalize(),
+            "session_id": session_id, "agent_name": agent_name,
             "pane_id": pane_id,
         })
 
@@ -304,12 +322,9 @@ class Router:
             "terminal": terminal,
         })
 
-    async def _agent_stop(self, session_id: str) -> dict:
-        session = self.db.get_session(session_id)
-        if not session:
-            return _response(404, {"error": "session not found"})
-
-        terminal_data = session.get("terminal", "{}")
+    @_needs_session
+    async def _agent_stop(self, session_id: str, session: dict) -> dict:
+        terminal_data = session.get("_terminal_obj") or session.get("terminal", "{}")
         result = await stop_session(terminal_data)
 
         # Mark session as ended regardless of terminal result
@@ -319,13 +334,9 @@ class Router:
             "category": "stop",
             "title": f"{session['agent_name']}: Stopped by user",
         }
-        self.db.insert_event(stop_data)
-        self.db.upsert_session(stop_data)
+        self.db.record_event(stop_data)
 
-        await self.sse.broadcast({
-            "type": "action", "action": "stop",
-            "session_id": session_id, "agent_name": session["agent_name"],
-        })
+        await self.sse.broadcast_action("stop", session_id, session["agent_name"])
 
         if result.get("ok"):
             return _response(200, {"status": "stopped", "session_id": session_id})
@@ -336,69 +347,54 @@ class Router:
             "warning": result.get("error", "terminal command failed"),
         })
 
-    async def _agent_approve(self, session_id: str) -> dict:
-        session = self.db.get_session(session_id)
-        if not session:
-            return _response(404, {"error": "session not found"})
-        result = await send_approve(session.get("terminal", "{}"))
+    @_needs_session
+    async def _agent_approve(self, session_id: str, session: dict) -> dict:
+        result = await send_approve(session.get("_terminal_obj") or session.get("terminal", "{}"))
         if result.get("ok"):
-            await self.sse.broadcast({
-                "type": "action", "action": "approve",
-                "session_id": session_id, "agent_name": session["agent_name"],
-            })
+            await self.sse.broadcast_action(
+                "approve", session_id, session["agent_name"]
+            )
             return _response(200, {"status": "approved", "session_id": session_id})
         return _response(500, {"error": result.get("error", "failed")})
 
-    async def _agent_reject(self, session_id: str) -> dict:
-        session = self.db.get_session(session_id)
-        if not session:
-            return _response(404, {"error": "session not found"})
-        result = await send_reject(session.get("terminal", "{}"))
+    @_needs_session
+    async def _agent_reject(self, session_id: str, session: dict) -> dict:
+        result = await send_reject(session.get("_terminal_obj") or session.get("terminal", "{}"))
         if result.get("ok"):
-            await self.sse.broadcast({
-                "type": "action", "action": "reject",
-                "session_id": session_id, "agent_name": session["agent_name"],
-            })
+            await self.sse.broadcast_action(
+                "reject", session_id, session["agent_name"]
+            )
             return _response(200, {"status": "rejected", "session_id": session_id})
         return _response(500, {"error": result.get("error", "failed")})
 
-    async def _agent_send(self, session_id: str, body: dict) -> dict:
-        session = self.db.get_session(session_id)
-        if not session:
-            return _response(404, {"error": "session not found"})
+    @_needs_session
+    async def _agent_send(self, session_id: str, session: dict, body: dict) -> dict:
         text = body.get("text", "")
         if not text:
-            return _response(400, {"error": "text required"})
+            return _RESP_400_TEXT
         # Append newline if not present
         if not text.endswith("\n"):
             text += "\n"
-        result = await send_text(session.get("terminal", "{}"), text)
+        result = await send_text(session.get("_terminal_obj") or session.get("terminal", "{}"), text)
         if result.get("ok"):
-            await self.sse.broadcast({
-                "type": "action", "action": "send",
-                "session_id": session_id, "agent_name": session["agent_name"],
-                "text": body.get("text", ""),
-            })
+            await self.sse.broadcast_action(
+                "send", session_id, session["agent_name"], text=body.get("text", "")
+            )
             return _response(200, {"status": "sent", "session_id": session_id})
         return _response(500, {"error": result.get("error", "failed")})
 
-    async def _agent_interrupt(self, session_id: str) -> dict:
-        session = self.db.get_session(session_id)
-        if not session:
-            return _response(404, {"error": "session not found"})
-        result = await send_interrupt(session.get("terminal", "{}"))
+    @_needs_session
+    async def _agent_interrupt(self, session_id: str, session: dict) -> dict:
+        result = await send_interrupt(session.get("_terminal_obj") or session.get("terminal", "{}"))
         if result.get("ok"):
-            await self.sse.broadcast({
-                "type": "action", "action": "interrupt",
-                "session_id": session_id, "agent_name": session["agent_name"],
-            })
+            await self.sse.broadcast_action(
+                "interrupt", session_id, session["agent_name"]
+            )
             return _response(200, {"status": "interrupted", "session_id": session_id})
         return _response(500, {"error": result.get("error", "failed")})
 
-    def _agent_events(self, session_id: str, query: dict) -> dict:
-        session = self.db.get_session(session_id)
-        if not session:
-            return _response(404, {"error": "session not found"})
+    @_needs_session
+    def _agent_events(self, session_id: str, session: dict, query: dict) -> dict:
         limit = _int_param(query, "limit", 50)
         events = self.db.session_events(session_id, limit=limit)
         return _response(200, events)
@@ -411,16 +407,22 @@ class Router:
         if not body.get("content"):
             return _response(400, {"error": "content required"})
 
-        msg_id = self.db.insert_message(body)
-        result = await route_message(self.db, msg_id)
-
-        msg_data = self.db.get_message(msg_id)
-        if msg_data:
-            await self.sse.broadcast({
-                "type": "message",
-                **msg_data,
-                "routing": result.get("action", "unknown"),
-            })
+        msg_data = self.db.insert_message(body)
+        msg_id = msg_data["id"]
+        result = await route_message(self.db, msg_id, msg=msg_data)
+
+        # The inserted row predates routing; patch the status it may have
+        # just changed rather than re-reading the row.
+        action = result.get("action", "unknown")
+        if action == "delivered":
+            msg_data["status"] = "delivered"
+        elif action == "blocked":
+            msg_data["status"] = "rejected"
+        await self.sse.broadcast({
+            "type": "message",
+            **msg_data,
+            "routing": action,
+        })
 
         return _response(201, {"id": msg_id, **result})
 
@@ -432,21 +434,13 @@ class Router:
         )
         return _response(200, messages)
 
-    def _get_message(self, msg_id_str: str) -> dict:
-        try:
-            msg_id = int(msg_id_str)
-        except ValueError:
-            return _response(400, {"error": "invalid message id"})
+    def _get_message(self, msg_id: int) -> dict:
         msg = self.db.get_message(msg_id)
         if not msg:
-            return _response(404, {"error": "message not found"})
+            return _RESP_404_MESSAGE
         return _response(200, msg)
 
-    async def _approve_message(self, msg_id_str: str) -> dict:
-        try:
-            msg_id = int(msg_id_str)
-        except ValueError:
-            return _response(400, {"error": "invalid message id"})
+    async def _approve_message(self, msg_id: int) -> dict:
         result = await approve_message(self.db, msg_id)
         if result.get("action") == "delivered":
             await self.sse.broadcast({
@@ -456,11 +450,7 @@ class Router:
             return _response(200, result)
         return _response(500, result)
 
-    async def _reject_message(self, msg_id_str: str) -> dict:
-        try:
-            msg_id = int(msg_id_str)
-        except ValueError:
-            return _response(400, {"error": "invalid message id"})
+    async def _reject_message(self, msg_id: int) -> dict:
         result = await reject_message(self.db, msg_id)
         if result.get("ok"):
             await self.sse.broadcast({
@@ -474,7 +464,7 @@ class Router:
 
     def _post_task(self, body: dict) -> dict:
         if not body.get("title"):
-            return _response(400, {"error": "title required"})
+            return _RESP_400_TITLE
         task_id = self.db.insert_task(body)
         return _response(201, {"id": task_id, "status": "created"})
 
@@ -487,34 +477,48 @@ class Router:
         )
         return _response(200, tasks)
 
-    def _get_task(self, task_id_str: str) -> dict:
-        try:
-            task_id = int(task_id_str)
-        except ValueError:
-            return _response(400, {"error": "invalid task id"})
+    def _get_task(self, task_id: int) -> dict:
         task = self.db.get_task(task_id)
         if not task:
-            return _response(404, {"error": "task not found"})
+            return _RESP_404_TASK
         return _response(200, task)
 
-    def _update_task(self, task_id_str: str, body: dict) -> dict:
-        try:
-            task_id = int(task_id_str)
-        except ValueError:
-            return _response(400, {"error": "invalid task id"})
+    def _update_task(self, task_id: int, body: dict) -> dict:
         if self.db.update_task(task_id, body):
             task = self.db.get_task(task_id)
             return _response(200, task)
-        return _response(404, {"error": "task not found"})
+        return _RESP_404_TASK
 
-    def _delete_task(self, task_id_str: str) -> dict:
-        try:
-            task_id = int(task_id_str)
-        except ValueError:
-            return _response(400, {"error": "invalid task id"})
+    def _delete_task(self, task_id: int) -> dict:
         if self.db.delete_task(task_id):
             return _response(200, {"status": "deleted"})
-        return _response(404, {"error": "task not found"})
+        return _RESP_404_TASK
+
+    def _guard_check(self, query: dict) -> dict:
+        """Pending-task summary for the Stop-hook guard, in one round trip.
+
+        Returns titles of tasks assigned to the session plus (when
+        global=1 and nothing is assigned) the next unassigned actionable
+        task, so the guard makes a single HTTP call on its critical path.
+        """
+        session_id = query.get("session_id", "")
+        assigned = []
+        if session_id:
+            # Hoist the dict.get attribute lookup out of the loop.
+            get = dict.get
+            assigned = [
+                get(t, "title", "untitled")
+                for t in self.db.list_tasks(
+                    session_id=session_id, status="pending", limit=5,
+                    parse_deps=False,
+                )
+            ]
+        global_titles = []
+        if not assigned and query.get("global") == "1":
+            nxt = self.db.next_task()
+            if nxt:
+                global_titles = [nxt.get("title", "untitled")]
+        return _response(200, {"assigned": assigned, "global": global_titles})
 
     def _next_task(self, query: dict) -> dict:
         task = self.db.next_task(session_id=query.get("session_id"))
@@ -532,14 +536,10 @@ class Router:
         rules = self.db.list_rules()
         return _response(200, rules)
 
-    def _delete_rule(self, rule_id_str: str) -> dict:
-        try:
-            rule_id = int(rule_id_str)
-        except ValueError:
-            return _response(400, {"error": "invalid rule id"})
+    def _delete_rule(self, rule_id: int) -> dict:
         if self.db.delete_rule(rule_id):
             return _response(200, {"status": "deleted"})
-        return _response(404, {"error": "rule not found"})
+        return _RESP_404_RULE
 
     # --- Heartbeat ---
 
@@ -547,11 +547,11 @@ class Router:
         session_id = body.get("session_id", "")
         if not session_id:
             return _response(400, {"error": "session_id required"})
-        found = self.db.heartbeat(session_id)
+        found = self.db.heartbeat_async(session_id)
         if found:
             self.monitor.clear_alert(session_id)
             return _response(200, {"status": "ok"})
-        return _response(404, {"error": "session not found"})
+        return _RESP_404_SESSION
 
     # --- Swarm: child sessions ---
 
@@ -562,13 +562,21 @@ class Router:
     # --- Context (shared variables) ---
 
     def _list_context(self, query: dict) -> dict:
+        key = query.get("key")
+        if key:
+            # Keyed lookup: one row by (key, scope) primary key instead
+            # of shipping the whole scope to the client.
+            item = self.db.get_context(key, scope=query.get("scope") or "global")
+            if item is None:
+                return _RESP_404_CONTEXT
+            return _response(200, item)
         ctx = self.db.list_context(scope=query.get("scope"))
         return _response(200, ctx)
 
     def _set_context(self, body: dict) -> dict:
         key = body.get("key", "")
         if not key:
-            return _response(400, {"error": "key required"})
+            return _RESP_400_KEY
         value = body.get("value", "")
         scope = body.get("scope", "global")
         updated_by = body.get("updated_by", "")
@@ -578,7 +586,7 @@ class Router:
     def _delete_context(self, key: str, scope: str) -> dict:
         if self.db.delete_context(key, scope=scope):
             return _response(200, {"status": "deleted"})
-        return _response(404, {"error": "context variable not found"})
+        return _RESP_404_CONTEXT
 
     # --- Preferences ---
 
@@ -590,14 +598,14 @@ class Router:
         key = body.get("key", "")
         value = body.get("value", "")
         if not key:
-            return _response(400, {"error": "key required"})
+            return _RESP_400_KEY
         self.db.set_preference(key, value)
         return _response(200, {"status": "ok", "key": key, "value": value})
 
     def _delete_preference(self, key: str) -> dict:
         if self.db.delete_preference(key):
             return _response(200, {"status": "deleted"})
-        return _response(404, {"error": "preference not found"})
+        return _RESP_404_PREFERENCE
 
 
 def _response(status: int, body: Any) -> dict:
@@ -5,13 +5,13 @@ Serves the API, SSE streams, and the web dashboard.
 
 import asyncio
 import json
-import mimetypes
 import os
 import signal
+import stat
 import sys
 import time
 from pathlib import Path
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import parse_qs
 
 from .db import Database
 from .monitor import Monitor
@@ -19,8 +19,51 @@ from .pid import write_pid, remove_pid
 from .routes import Router
 from .sse import SSERegistry
 
+try:
+    # Optional: C-speed codec; dumps emits bytes and loads takes them,
+    # skipping an encode/decode round per request.
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
 STATIC_DIR = Path(__file__).parent / "static"
 
+# The dashboard ships a handful of known file types; a dict lookup
+# replaces mimetypes.guess_type, which takes a lock and splits the
+# filename on every call.
+_MIME = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "application/javascript",
+    ".css": "text/css",
+    ".svg": "image/svg+xml",
+    ".ico": "image/x-icon",
+    ".json": "application/json",
+}
+
+# Below this size one read+write beats the sendfile syscall setup.
+_SENDFILE_MIN = 16 * 1024
+
+# How long a kept-alive connection may sit idle between requests.
+_KEEPALIVE_TIMEOUT = 5
+
+# The invariant tail of every API response header, encoded once. Two
+# variants: kept-alive connections serve the dashboard's polling without
+# re-doing the TCP handshake and task setup per request.
+_CORS_COMMON = (
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Methods: GET, POST, PUT, DELETE, OPTIONS\r\n"
+    b"Access-Control-Allow-Headers: Content-Type\r\n"
+)
+_CORS_CLOSE = _CORS_COMMON + b"Connection: close\r\n\r\n"
+_CORS_KEEPALIVE = _CORS_COMMON + b"Connection: keep-alive\r\n\r\n"
+
 _STATUS_TEXT = {
     200: "OK",
     201: "Created",
@@ -30,6 +73,14 @@ _STATUS_TEXT = {
     500: "Internal Server Error",
 }
 
+# Full status lines pre-encoded: every response starts with one of
+# these, so the per-call f-string and encode go away.
+_STATUS_LINE = {
+    code: f"HTTP/1.1 {code} {text}\r\n".encode()
+    for code, text in _STATUS_TEXT.items()
+}
+_CONTENT_TYPE_JSON = b"Content-Type: application/json\r\n"
+
 
 class HttpServer:
     def __init__(self, port: int = 7878, db_path: str | None = None):
@@ -40,6 +91,12 @@ class HttpServer:
         self.monitor = Monitor(self.db, self.sse)
         self.router = Router(self.db, self.sse, self.monitor, self.start_time)
         self._server: asyncio.AbstractServer | None = None
+        self._uds_server: asyncio.AbstractServer | None = None
+        self._sock_path = f"/tmp/agent-notify-daemon-{port}.sock"
+        # Static assets: filename -> (mtime, size, header bytes, body bytes).
+        # Body is cached only below the sendfile cutoff; larger files keep
+        # streaming from the page cache. Invalidated when stat changes.
+        self._static_cache: dict[str, tuple[float, int, bytes, bytes | None]] = {}
 
     async def start(self) -> None:
         self.db.initialize()
@@ -63,6 +120,18 @@ class HttpServer:
                 sys.exit(1)
             raise
 
+        # Also serve the same HTTP protocol over a unix socket: local
+        # clients on the Stop-hook critical path (guard.py) skip the TCP
+        # stack entirely. Best-effort — TCP remains the primary listener.
+        try:
+            if os.path.exists(self._sock_path):
+                os.unlink(self._sock_path)
+            self._uds_server = await asyncio.start_unix_server(
+                self._handle_connection, path=self._sock_path
+            )
+        except (OSError, NotImplementedError, AttributeError):
+            self._uds_server = None
+
         loop = asyncio.get_running_loop()
         for sig in (signal.SIGTERM, signal.SIGINT):
             loop.add_signal_handler(sig, lambda: asyncio.ensure_future(self.stop()))
@@ -82,51 +151,81 @@ class HttpServer:
         if self._server:
             self._server.close()
             await self._server.wait_closed()
+        if self._uds_server:
+            self._uds_server.close()
+            await self._uds_server.wait_closed()
+            try:
+                os.unlink(self._sock_path)
+            except OSError:
+                pass
         remove_pid()
         asyncio.get_running_loop().stop()
 
     async def _handle_connection(
         self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
     ) -> None:
+        # Bytes read past the end of one request carry over to the next.
+        carry = bytearray()
         try:
-            request = await self._read_request(reader)
-            if request is None:
-                writer.close()
-                return
-
-            # Handle CORS preflight
-            if request["method"] == "OPTIONS":
-                self._write_response(writer, 200, "")
-                await writer.drain()
-                writer.close()
-                return
+            # Keep-alive: serve requests on this connection until the peer
+            # closes, asks to close, or sits idle past the timeout.
+            timeout = 10
+            while True:
+                request, err = await self._read_request(reader, carry, timeout)
+                if request is None:
+                    # A reason means we parsed garbage worth answering;
+                    # plain disconnects and idle timeouts close silently
+                    # without the cost of raising through the stack.
+                    if err is not None and not writer.is_closing():
+                        self._write_response(writer, 400, {"error": err})
+                        await writer.drain()
+                    break
 
-            result = await self.router.dispatch(request)
+                # Handle CORS preflight
+                if request["method"] == "OPTIONS":
+                    self._write_response(writer, 200, None)
+                    await writer.drain()
+                    break
 
-            if result is None:
-                # SSE: router signals writer ownership
-                await self.sse.register(writer)
-                return
+                result = await self.router.dispatch(request)
 
-            # Serve static file
-            if result.get("serve_static"):
-                await self._serve_static(writer, result["serve_static"])
-                return
+                if result is None:
+                    # SSE: router signals writer ownership
+                    await self.sse.register(writer)
+                    return
 
-            status = result.get("status", 200)
-            body = result.get("body", {})
-            self._write_response(writer, status, json.dumps(body))
-            await writer.drain()
+                # Serve static file
+                if result.get("serve_static"):
+                    await self._serve_static(writer, result["serve_static"])
+                    return
+
+                status = result.get("status", 200)
+                body = result.get("body", {})
+                # HTTP/1.1 defaults to keep-alive; 1.0 clients (like the
+                # guard's unix-socket fast path, which reads to EOF) only
+                # get it when they ask explicitly.
+                conn = request["headers"].get("connection", "").lower()
+                if request["version"] == "HTTP/1.1":
+                    keep = conn != "close"
+                else:
+                    keep = conn == "keep-alive"
+                self._write_response(writer, status, body, keep_alive=keep)
+                # Short-circuit a dead peer before drain raises for it
+                if writer.is_closing():
+                    break
+                await writer.drain()
+                if not keep:
+                    break
+                timeout = _KEEPALIVE_TIMEOUT
         except (ConnectionResetError, BrokenPipeError):
             pass
         except Exception as e:
-            try:
-                self._write_response(
-                    writer, 500, json.dumps({"error": str(e)})
-                )
-                await writer.drain()
-            except Exception:
-                pass
+            if not writer.is_closing():
+                try:
+                    self._write_response(writer, 500, {"error": str(e)})
+                    await writer.drain()
+                except (ConnectionResetError, BrokenPipeError, OSError):
+                    pass
         finally:
             if writer and not writer.is_closing():
                 try:
@@ -138,104 +237,145 @@ class HttpServer:
         self, writer: asyncio.StreamWriter, filename: str
     ) -> None:
         filepath = STATIC_DIR / filename
-        if not filepath.is_file():
-            self._write_response(writer, 404, '{"error":"not found"}')
+        try:
+            st = filepath.stat()
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            self._write_response(writer, 404, {"error": "not found"})
             await writer.drain()
             return
 
-        content = filepath.read_bytes()
-        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
-        header = (
-            f"HTTP/1.1 200 OK\r\n"
-            f"Content-Type: {content_type}\r\n"
-            f"Content-Length: {len(content)}\r\n"
-            f"Cache-Control: no-cache\r\n"
-            f"Connection: close\r\n"
-            f"\r\n"
-        )
-        writer.write(header.encode() + content)
+        cached = self._static_cache.get(filename)
+        if cached is not None and cached[0] == st.st_mtime and cached[1] == st.st_size:
+            header, content = cached[2], cached[3]
+        else:
+            content_type = _MIME.get(
+                os.path.splitext(filename)[1], "application/octet-stream"
+            )
+            header = (
+                f"HTTP/1.1 200 OK\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {st.st_size}\r\n"
+                f"Cache-Control: no-cache\r\n"
+                f"Connection: close\r\n"
+                f"\r\n"
+            ).encode()
+            # Small assets: serve from memory, one write beats a syscall
+            # dance. Larger ones cache only the header.
+            content = filepath.read_bytes() if st.st_size < _SENDFILE_MIN else None
+            self._static_cache[filename] = (st.st_mtime, st.st_size, header, content)
+
+        if content is not None:
+            writer.writelines((header, content))
+            await writer.drain()
+            return
+
+        # Large assets go out via sendfile(2): the kernel streams the file
+        # into the socket without copying it through the Python heap.
+        writer.write(header)
         await writer.drain()
+        with open(filepath, "rb") as f:
+            await asyncio.get_running_loop().sendfile(
+                writer.transport, f, fallback=True
+            )
 
-    async def _read_request(self, reader: asyncio.StreamReader) -> dict | None:
+    async def _read_request(
+        self, reader: asyncio.StreamReader, buf: bytearray, timeout: float = 10
+    ) -> tuple[dict | None, str | None]:
+        # Buffered parse: accumulate chunks and locate the header
+        # terminator with one C-level find per chunk, instead of an async
+        # readline hop plus decode/strip per header line. buf holds bytes
+        # left over from the previous request on this connection.
+        #
+        # Returns (request, None) on success, (None, reason) for input bad
+        # enough to deserve a 400, and (None, None) for plain disconnects.
         try:
-            request_line = await asyncio.wait_for(
-                reader.readline(), timeout=10
-            )
+            while (idx := buf.find(b"\r\n\r\n")) < 0:
+                chunk = await asyncio.wait_for(reader.read(65536), timeout=timeout)
+                if not chunk:
+                    return None, None
+                buf += chunk
+                if len(buf) > 65536:  # runaway header section
+                    return None, "header section too large"
         except (asyncio.TimeoutError, ConnectionResetError):
-            return None
+            return None, None
 
-        if not request_line:
-            return None
+        lines = bytes(buf[:idx]).split(b"\r\n")
+        rest = buf[idx + 4:]
 
-        try:
-            line = request_line.decode().strip()
-            parts = line.split(" ", 2)
-            if len(parts) < 2:
-                return None
-            method = parts[0].upper()
-            raw_path = parts[1]
-        except (UnicodeDecodeError, IndexError):
-            return None
-
-        # Parse path and query string
-        parsed = urlparse(raw_path)
-        path = parsed.path.rstrip("/") or "/"
-        query = {}
-        for k, v in parse_qs(parsed.query).items():
-            query[k] = v[0] if len(v) == 1 else v
-
-        # Read headers
+        parts = lines[0].split(b" ", 2)
+        if len(parts) < 2:
+            return None, "malformed request line"
+        method = parts[0].decode("latin-1").upper()
+        raw_path = parts[1].decode("latin-1")
+        version = parts[2].decode("latin-1") if len(parts) > 2 else "HTTP/1.0"
+
+        # Parse path and query string. Most requests carry no query at
+        # all, so a find beats running urlparse + parse_qs every time.
+        qpos = raw_path.find("?")
+        if qpos < 0:
+            path = raw_path.rstrip("/") or "/"
+            query = {}
+        else:
+            path = raw_path[:qpos].rstrip("/") or "/"
+            query = {}
+            for k, v in parse_qs(raw_path[qpos + 1:]).items():
+                query[k] = v[0] if len(v) == 1 else v
+
+        # Headers stay bytes until the final decode per key/value
         headers = {}
-        while True:
-            try:
-                header_line = await asyncio.wait_for(
-                    reader.readline(), timeout=5
+        for line in lines[1:]:
+            key, sep, val = line.partition(b":")
+            if sep:
+                headers[key.strip().lower().decode("latin-1")] = (
+                    val.strip().decode("latin-1")
                 )
-            except (asyncio.TimeoutError, ConnectionResetError):
-                break
-            if header_line in (b"\r\n", b"\n", b""):
-                break
-            try:
-                decoded = header_line.decode().strip()
-                if ":" in decoded:
-                    key, val = decoded.split(":", 1)
-                    headers[key.strip().lower()] = val.strip()
-            except UnicodeDecodeError:
-                continue
-
-        # Read body if Content-Length present
+
+        # Read whatever of the body didn't arrive with the headers
         body = {}
-        content_length = int(headers.get("content-length", 0))
+        try:
+            content_length = int(headers.get("content-length", 0))
+        except ValueError:
+            content_length = 0
         if content_length > 0:
             try:
-                raw = await asyncio.wait_for(
-                    reader.readexactly(content_length), timeout=10
-                )
-                body = json.loads(raw.decode())
-            except (asyncio.TimeoutError, json.JSONDecodeError, UnicodeDecodeError):
+                missing = content_length - len(rest)
+                if missing > 0:
+                    rest += await asyncio.wait_for(
+                        reader.readexactly(missing), timeout=10
+                    )
+                body = _loads(bytes(rest[:content_length]))
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
                 body = {}
 
+        # Anything past this request's body belongs to the next one
+        buf[:] = rest[content_length:]
+
         return {
             "method": method,
             "path": path,
+            "version": version,
             "query": query,
             "headers": headers,
             "body": body,
-        }
+        }, None
 
     def _write_response(
-        self, writer: asyncio.StreamWriter, status: int, body: str
+        self, writer: asyncio.StreamWriter, status: int, body, keep_alive: bool = False
     ) -> None:
-        status_text = _STATUS_TEXT.get(status, "Unknown")
-        body_bytes = body.encode()
-        header = (
-            f"HTTP/1.1 {status} {status_text}\r\n"
-            f"Content-Type: application/json\r\n"
-            f"Content-Length: {len(body_bytes)}\r\n"
-            f"Access-Control-Allow-Origin: *\r\n"
-            f"Access-Control-Allow-Methods: GET, POST, PUT, DELETE, OPTIONS\r\n"
-            f"Access-Control-Allow-Headers: Content-Type\r\n"
-            f"Connection: close\r\n"
-            f"\r\n"
+        """Serialize body (any JSON-encodable object, or None for empty)
+        and write the response."""
+        body_bytes = b"" if body is None else _dumps(body)
+        status_line = (
+            _STATUS_LINE.get(status)
+            or f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, 'Unknown')}\r\n".encode()
         )
-        writer.write(header.encode() + body_bytes)
+        tail = _CORS_KEEPALIVE if keep_alive else _CORS_CLOSE
+        writer.writelines((
+            status_line,
+            _CONTENT_TYPE_JSON,
+            b"Content-Length: %d\r\n" % len(body_bytes),
+            tail,
+            body_bytes,
+        ))
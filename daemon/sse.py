@@ -3,18 +3,72 @@
 import asyncio
 import json
 
+try:
+    # Optional: C-speed encoder; emits bytes directly, skipping the
+    # str-then-encode round trip per broadcast.
+    import orjson
+
+    _dumps = orjson.dumps
+except ImportError:
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+
+
+# Per-client buffer depth and how many consecutive full-queue broadcasts a
+# client may miss before it is evicted as a slow consumer.
+_MAX_QUEUE = 256
+_MAX_OVERFLOWS = 3
+
+# Broadcasts within this window coalesce into one write per client, so an
+# event burst costs one drain per client instead of one per event.
+_BATCH_WINDOW = 0.005
+
+# Fixed stream handshake and keepalive frames, encoded once.
+# X-Accel-Buffering stops nginx-style proxies from holding events until
+# their buffer fills; the retry field sets the client's reconnect delay
+# to match the keepalive interval.
+_HANDSHAKE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Connection: keep-alive\r\n"
+    b"X-Accel-Buffering: no\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"\r\n"
+    b"retry: 15000\n\n"
+)
+_KEEPALIVE = b": keepalive\n\n"
+
+
+class _Client:
+    __slots__ = ("writer", "queue", "overflows", "disconnected")
+
+    def __init__(self, writer: asyncio.StreamWriter, disconnected: asyncio.Future):
+        self.writer = writer
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=_MAX_QUEUE)
+        self.overflows = 0
+        self.disconnected = disconnected
+
 
 class SSERegistry:
     def __init__(self):
-        self._clients: list[asyncio.StreamWriter] = []
+        self._clients: list[_Client] = []
         self._lock = asyncio.Lock()
         self._keepalive_task: asyncio.Task | None = None
+        self._pending: list[bytes] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
 
     def start(self) -> None:
         if self._keepalive_task is None:
             self._keepalive_task = asyncio.ensure_future(self._keepalive_loop())
 
     async def stop(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending.clear()
         if self._keepalive_task:
             self._keepalive_task.cancel()
             try:
@@ -23,9 +77,11 @@ class SSERegistry:
                 pass
             self._keepalive_task = None
         async with self._lock:
-            for writer in self._clients:
+            for client in self._clients:
+                if not client.disconnected.done():
+                    client.disconnected.set_result(None)
                 try:
-                    writer.close()
+                    client.writer.close()
                 except Exception:
                     pass
             self._clients.clear()
@@ -36,66 +92,142 @@ class SSERegistry:
 
     async def register(self, writer: asyncio.StreamWriter) -> None:
         """Send SSE headers and hold the connection open until disconnect."""
-        header = (
-            "HTTP/1.1 200 OK\r\n"
-            "Content-Type: text/event-stream\r\n"
-            "Cache-Control: no-cache\r\n"
-            "Connection: keep-alive\r\n"
-            "Access-Control-Allow-Origin: *\r\n"
-            "\r\n"
-        )
-        writer.write(header.encode())
+        writer.write(_HANDSHAKE)
         await writer.drain()
 
+        loop = asyncio.get_running_loop()
+        client = _Client(writer, loop.create_future())
+
+        # Wake on actual disconnect instead of polling is_closing at 1 Hz:
+        # chain the transport protocol's connection_lost into the future,
+        # so idle clients cost no wakeups at all.
+        protocol = writer.transport.get_protocol()
+        original_lost = protocol.connection_lost
+
+        def connection_lost(exc, _fut=client.disconnected):
+            if not _fut.done():
+                _fut.set_result(None)
+            original_lost(exc)
+
+        protocol.connection_lost = connection_lost
+
         async with self._lock:
-            self._clients.append(writer)
+            self._clients.append(client)
+
+        # Pump this client's queue until it disconnects. Each client drains
+        # at its own pace here, so broadcasts never await a slow consumer.
+        async def pump() -> None:
+            try:
+                while True:
+                    payload = await client.queue.get()
+                    writer.write(payload)
+                    await writer.drain()
+            except (ConnectionResetError, BrokenPipeError, OSError):
+                pass
+            finally:
+                if not client.disconnected.done():
+                    client.disconnected.set_result(None)
 
-        # Block until client disconnects
+        pump_task = asyncio.ensure_future(pump())
         try:
-            while True:
-                await asyncio.sleep(1)
-                if writer.is_closing():
-                    break
-        except (ConnectionResetError, BrokenPipeError, asyncio.CancelledError):
+            await client.disconnected
+        except asyncio.CancelledError:
             pass
         finally:
+            pump_task.cancel()
             async with self._lock:
-                if writer in self._clients:
-                    self._clients.remove(writer)
+                if client in self._clients:
+                    self._clients.remove(client)
+            try:
+                writer.close()
+            except Exception:
+                pass
 
     async def broadcast(self, event: dict) -> None:
-        data = json.dumps(event)
-        payload = f"event: notification\ndata: {data}\n\n".encode()
-        dead: list[asyncio.StreamWriter] = []
-        async with self._lock:
-            for writer in self._clients:
-                try:
-                    writer.write(payload)
-                    await writer.drain()
-                except (ConnectionResetError, BrokenPipeError, OSError):
-                    dead.append(writer)
-            for writer in dead:
-                self._clients.remove(writer)
-                try:
-                    writer.close()
-                except Exception:
-                    pass
+        await self._fanout(b"event: notification\ndata: %b\n\n" % _dumps(event))
 
-    async def _keepalive_loop(self) -> None:
-        while True:
-            await asyncio.sleep(15)
-            payload = b": keepalive\n\n"
-            dead: list[asyncio.StreamWriter] = []
-            async with self._lock:
-                for writer in self._clients:
-                    try:
-                        writer.write(payload)
-                        await writer.drain()
-                    except (ConnectionResetError, BrokenPipeError, OSError):
-                        dead.append(writer)
-                for writer in dead:
-                    self._clients.remove(writer)
+    async def broadcast_action(
+        self, action: str, session_id: str, agent_name: str, **extra
+    ) -> None:
+        """Broadcast the standard control-plane action payload.
+
+        The stop/approve/reject/send/interrupt handlers all emit the same
+        shape; building it here keeps the per-call allocation to one dict.
+        """
+        payload = {
+            "type": "action",
+            "action": action,
+            "session_id": session_id,
+            "agent_name": agent_name,
+        }
+        if extra:
+            payload.update(extra)
+        await self._fanout(b"event: notification\ndata: %b\n\n" % _dumps(payload))
+
+    async def broadcast_many(self, events: list[dict]) -> None:
+        """Fan a batch of events out in one pass.
+
+        Each event is JSON-encoded exactly once and every client gets a
+        single concatenated write, instead of one lock/write round per
+        event per client.
+        """
+        if not events:
+            return
+        await self._fanout(b"".join(
+            b"event: notification\ndata: %b\n\n" % _dumps(e)
+            for e in events
+        ))
+
+    async def _fanout(self, payload: bytes) -> None:
+        """Queue a payload and schedule a coalescing flush.
+
+        Payloads arriving within _BATCH_WINDOW are joined and delivered
+        to each client as a single write, so a burst of events costs one
+        drain per client rather than one per event.
+        """
+        self._pending.append(payload)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                _BATCH_WINDOW, self._flush
+            )
+
+    def _flush(self) -> None:
+        """Enqueue the pending batch for every client without awaiting.
+
+        put_nowait keeps broadcast latency independent of the slowest
+        consumer; a client whose queue is still full after _MAX_OVERFLOWS
+        consecutive broadcasts is evicted instead of stalling the daemon
+        or growing its memory unboundedly.
+
+        Plain synchronous code, so the loop runs atomically in event-loop
+        terms over a snapshot of the client list — no lock needed, and a
+        flush never contends with register/stop.
+        """
+        self._flush_handle = None
+        if not self._pending:
+            return
+        payload = (
+            self._pending[0]
+            if len(self._pending) == 1
+            else b"".join(self._pending)
+        )
+        self._pending.clear()
+        for client in list(self._clients):
+            try:
+                client.queue.put_nowait(payload)
+                client.overflows = 0
+            except asyncio.QueueFull:
+                client.overflows += 1
+                if client.overflows >= _MAX_OVERFLOWS:
+                    self._clients.remove(client)
+                    if not client.disconnected.done():
+                        client.disconnected.set_result(None)
                     try:
-                        writer.close()
+                        client.writer.close()
                     except Exception:
                         pass
+
+    async def _keepalive_loop(self) -> None:
+        while True:
+            await asyncio.sleep(15)
+            await self._fanout(_KEEPALIVE)
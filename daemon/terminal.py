@@ -7,10 +7,44 @@ The terminal is the API — we never talk to Anthropic/OpenAI/Google directly.
 """
 
 import asyncio
+import functools
 import json
 import os
 import shutil
 
+try:
+    # Optional: C-speed decoder for terminal JSON blobs.
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_terminal(s: str) -> dict | None:
+    """Parse a terminal JSON string, memoized.
+
+    The same blob is passed on every send for a session that missed the
+    row-level _terminal_obj cache, so repeats reuse the parsed dict —
+    including any command prefixes later stashed on it.
+    """
+    try:
+        obj = _json_loads(s)
+    except (ValueError, TypeError):
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+@functools.lru_cache(maxsize=8)
+def _which(cmd: str) -> str | None:
+    """Resolve a multiplexer binary once per daemon lifetime.
+
+    shutil.which walks PATH and stats each candidate; the CLIs we drive
+    don't move mid-session, so one scan per name is enough.
+    """
+    return shutil.which(cmd)
+
 
 async def send_text(terminal: dict | str, text: str) -> dict:
     """Send text to an agent's terminal pane.
@@ -18,9 +52,8 @@ async def send_text(terminal: dict | str, text: str) -> dict:
     Returns {"ok": True} on success, {"ok": False, "error": "..."} on failure.
     """
     if isinstance(terminal, str):
-        try:
-            terminal = json.loads(terminal)
-        except (json.JSONDecodeError, TypeError):
+        terminal = _parse_terminal(terminal)
+        if terminal is None:
             return {"ok": False, "error": "invalid terminal data"}
 
     if not terminal or not isinstance(terminal, dict):
@@ -53,9 +86,8 @@ async def send_reject(terminal: dict | str) -> dict:
 async def send_interrupt(terminal: dict | str) -> dict:
     """Send Ctrl-C to agent terminal."""
     if isinstance(terminal, str):
-        try:
-            terminal = json.loads(terminal)
-        except (json.JSONDecodeError, TypeError):
+        terminal = _parse_terminal(terminal)
+        if terminal is None:
             return {"ok": False, "error": "invalid terminal data"}
 
     mux = terminal.get("multiplexer", "")
@@ -91,24 +123,180 @@ async def _run(cmd: list[str]) -> dict:
         return {"ok": False, "error": "command timed out"}
 
 
+async def _run_stdin(cmd: list[str], data: bytes) -> dict:
+    """Run a subprocess feeding data on stdin."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await asyncio.wait_for(proc.communicate(data), timeout=5)
+        if proc.returncode == 0:
+            return {"ok": True}
+        err = stderr.decode().strip() or f"exit code {proc.returncode}"
+        return {"ok": False, "error": err}
+    except FileNotFoundError:
+        return {"ok": False, "error": f"command not found: {cmd[0]}"}
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": "command timed out"}
+
+
 # --- tmux ---
 
+class _TmuxControl:
+    """Long-lived tmux control-mode client, one per server socket.
+
+    Key sends ride an existing pipe instead of paying a fork/exec per
+    invocation. Replies use %begin/%end framing; asynchronous
+    notifications between blocks are discarded. Only commands with
+    simple arguments (pane ids, key names) go through here — literal
+    text would need tmux command-line quoting and stays on the
+    stdin-fed load-buffer path.
+    """
+
+    __slots__ = ("_cmd", "_proc", "_lock")
+
+    def __init__(self, tmux: str, socket: str):
+        cmd = [tmux]
+        if socket:
+            cmd.extend(["-S", socket])
+        # -A reattaches if the control session survived a daemon restart;
+        # the session itself holds no panes of interest.
+        cmd.extend(["-C", "new-session", "-A", "-s", "agent-notify-ctl"])
+        self._cmd = cmd
+        self._proc: asyncio.subprocess.Process | None = None
+        self._lock = asyncio.Lock()
+
+    async def cmd(self, line: str) -> dict:
+        async with self._lock:
+            try:
+                if self._proc is None or self._proc.returncode is not None:
+                    self._proc = await asyncio.create_subprocess_exec(
+                        *self._cmd,
+                        stdin=asyncio.subprocess.PIPE,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.DEVNULL,
+                    )
+                    # Consume the greeting block the attach emits
+                    await asyncio.wait_for(self._read_reply(), timeout=5)
+                self._proc.stdin.write(line.encode() + b"\n")
+                await self._proc.stdin.drain()
+                return await asyncio.wait_for(self._read_reply(), timeout=5)
+            except FileNotFoundError:
+                return {"ok": False, "error": f"command not found: {self._cmd[0]}"}
+            except asyncio.TimeoutError:
+                self._close()
+                return {"ok": False, "error": "command timed out"}
+            except (ConnectionResetError, BrokenPipeError, OSError):
+                self._close()
+                return {"ok": False, "error": "tmux control client lost"}
+
+    async def _read_reply(self) -> dict:
+        lines: list[str] = []
+        in_block = False
+        while True:
+            raw = await self._proc.stdout.readline()
+            if not raw:
+                self._close()
+                return {"ok": False, "error": "tmux control client closed"}
+            line = raw.decode(errors="replace").rstrip("\n")
+            if line.startswith("%begin"):
+                in_block = True
+            elif in_block and line.startswith("%end"):
+                return {"ok": True}
+            elif in_block and line.startswith("%error"):
+                return {"ok": False, "error": "\n".join(lines) or "tmux error"}
+            elif in_block:
+                lines.append(line)
+            # notifications outside blocks are ignored
+
+    def _close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc and proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+
+
+_tmux_controls: dict[str, _TmuxControl] = {}
+
+
+# Text sends are batched per pane: each tmux invocation costs a fork/exec
+# (milliseconds) that dwarfs the keystroke injection itself, so a burst of
+# send_text calls within the window collapses into one load-buffer/
+# paste-buffer pair fed over stdin.
+_BATCH_WINDOW = 0.005
+
+
+class _Batch:
+    __slots__ = ("chunks", "result")
+
+    def __init__(self):
+        self.chunks: list[str] = []
+        self.result: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+_tmux_batches: dict[tuple[str, str], _Batch] = {}
+
+
 async def _send_tmux(terminal: dict, text: str) -> dict:
-    socket = terminal.get("tmux_socket", "")
-    pane = terminal.get("tmux_pane", "")
-    if not pane:
-        return {"ok": False, "error": "no tmux pane"}
+    # The argv pair is identical per pane except for the text, so it is
+    # built once and stashed on the terminal dict. Underscore keys never
+    # make it back into the stored JSON, same as _terminal_obj.
+    cmds = terminal.get("_tmux_batch_cmds")
+    if cmds is None:
+        socket = terminal.get("tmux_socket", "")
+        pane = terminal.get("tmux_pane", "")
+        if not pane:
+            return {"ok": False, "error": "no tmux pane"}
+
+        tmux = _which("tmux")
+        if not tmux:
+            return {"ok": False, "error": "tmux not found"}
+
+        base = [tmux]
+        if socket:
+            base.extend(["-S", socket])
+        # Named per pane so concurrent flushes can't clobber each other's
+        # buffer; -d deletes it after the paste.
+        buf = f"agent-notify-{os.getpid()}-{pane}"
+        cmds = (
+            (socket, pane),
+            base + ["load-buffer", "-b", buf, "-"],
+            base + ["paste-buffer", "-d", "-b", buf, "-t", pane],
+        )
+        terminal["_tmux_batch_cmds"] = cmds
+
+    key, load_cmd, paste_cmd = cmds
+    batch = _tmux_batches.get(key)
+    if batch is None:
+        batch = _tmux_batches[key] = _Batch()
+        asyncio.get_running_loop().call_later(
+            _BATCH_WINDOW,
+            lambda: asyncio.ensure_future(_flush_tmux(key, load_cmd, paste_cmd)),
+        )
+    batch.chunks.append(text)
+    # Every caller in the window awaits the same flush result.
+    return await batch.result
 
-    tmux = shutil.which("tmux")
-    if not tmux:
-        return {"ok": False, "error": "tmux not found"}
 
-    # Use send-keys with literal flag for exact text
-    cmd = [tmux]
-    if socket:
-        cmd.extend(["-S", socket])
-    cmd.extend(["send-keys", "-t", pane, "-l", text])
-    return await _run(cmd)
+async def _flush_tmux(
+    key: tuple[str, str], load_cmd: list[str], paste_cmd: list[str]
+) -> None:
+    batch = _tmux_batches.pop(key, None)
+    if batch is None:
+        return
+    try:
+        result = await _run_stdin(load_cmd, "".join(batch.chunks).encode())
+        if result.get("ok"):
+            result = await _run(paste_cmd)
+    except Exception as e:
+        result = {"ok": False, "error": str(e)}
+    if not batch.result.done():
+        batch.result.set_result(result)
 
 
 async def _send_tmux_keys(terminal: dict, keys: str) -> dict:
@@ -117,15 +305,14 @@ async def _send_tmux_keys(terminal: dict, keys: str) -> dict:
     if not pane:
         return {"ok": False, "error": "no tmux pane"}
 
-    tmux = shutil.which("tmux")
+    tmux = _which("tmux")
     if not tmux:
         return {"ok": False, "error": "tmux not found"}
 
-    cmd = [tmux]
-    if socket:
-        cmd.extend(["-S", socket])
-    cmd.extend(["send-keys", "-t", pane, keys])
-    return await _run(cmd)
+    ctl = _tmux_controls.get(socket)
+    if ctl is None:
+        ctl = _tmux_controls[socket] = _TmuxControl(tmux, socket)
+    return await ctl.cmd(f"send-keys -t {pane} {keys}")
 
 
 # --- kitty ---
@@ -136,7 +323,7 @@ async def _send_kitty(terminal: dict, text: str) -> dict:
     if not window_id:
         return {"ok": False, "error": "no kitty window id"}
 
-    kitty = shutil.which("kitty")
+    kitty = _which("kitty")
     if not kitty:
         return {"ok": False, "error": "kitty not found"}
 
@@ -154,7 +341,7 @@ async def _send_wezterm(terminal: dict, text: str) -> dict:
     if not pane_id:
         return {"ok": False, "error": "no wezterm pane"}
 
-    wezterm = shutil.which("wezterm")
+    wezterm = _which("wezterm")
     if not wezterm:
         return {"ok": False, "error": "wezterm not found"}
 
@@ -169,7 +356,7 @@ async def _send_zellij(terminal: dict, text: str) -> dict:
     if not session:
         return {"ok": False, "error": "no zellij session"}
 
-    zellij = shutil.which("zellij")
+    zellij = _which("zellij")
     if not zellij:
         return {"ok": False, "error": "zellij not found"}
 
@@ -182,7 +369,7 @@ async def _send_zellij_action(terminal: dict, action: str, *args: str) -> dict:
     if not session:
         return {"ok": False, "error": "no zellij session"}
 
-    zellij = shutil.which("zellij")
+    zellij = _which("zellij")
     if not zellij:
         return {"ok": False, "error": "zellij not found"}
 
@@ -228,8 +415,13 @@ def _detect_multiplexer() -> dict:
     return {}
 
 
+@functools.lru_cache(maxsize=32)
 def _build_agent_command(agent: str, prompt: str, cwd: str) -> str:
-    """Build the shell command to launch an agent session."""
+    """Build the shell command to launch an agent session.
+
+    Memoized: respawns of the same (agent, prompt, cwd) triple reuse the
+    quoted command instead of re-quoting a potentially large prompt.
+    """
     binary = _AGENT_COMMANDS.get(agent, agent)
 
     # Build command with optional prompt and working directory
@@ -329,7 +521,7 @@ async def _run_capture(cmd: list[str]) -> dict:
 
 async def _spawn_tmux(mux: dict, shell_cmd: str, cwd: str) -> dict:
     """Spawn a new tmux pane with the given command."""
-    tmux = shutil.which("tmux")
+    tmux = _which("tmux")
     if not tmux:
         return {"ok": False, "error": "tmux not found"}
 
@@ -359,7 +551,7 @@ async def _spawn_tmux(mux: dict, shell_cmd: str, cwd: str) -> dict:
 
 async def _spawn_kitty(mux: dict, shell_cmd: str, cwd: str) -> dict:
     """Spawn a new kitty window with the given command."""
-    kitty = shutil.which("kitty")
+    kitty = _which("kitty")
     if not kitty:
         return {"ok": False, "error": "kitty not found"}
 
@@ -387,7 +579,7 @@ async def _spawn_kitty(mux: dict, shell_cmd: str, cwd: str) -> dict:
 
 async def _spawn_wezterm(mux: dict, shell_cmd: str, cwd: str) -> dict:
     """Spawn a new wezterm pane with the given command."""
-    wezterm = shutil.which("wezterm")
+    wezterm = _which("wezterm")
     if not wezterm:
         return {"ok": False, "error": "wezterm not found"}
 
@@ -411,7 +603,7 @@ async def _spawn_wezterm(mux: dict, shell_cmd: str, cwd: str) -> dict:
 
 async def _spawn_zellij(mux: dict, shell_cmd: str, cwd: str) -> dict:
     """Spawn a new zellij pane with the given command."""
-    zellij = shutil.which("zellij")
+    zellij = _which("zellij")
     if not zellij:
         return {"ok": False, "error": "zellij not found"}
 